@@ -1,46 +1,415 @@
 import streamlit as st
+import atexit
+import hashlib
+import io
 import json
-import sqlite3
 import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime
-import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Dict
 import os
 
-# Import our custom modules
-from query_parser import NaturalLanguageParser
-from sql_generator import SQLGenerator
-from query_executor import QueryExecutor
-from feedback_manager import FeedbackManager
-from schema_manager import SchemaManager
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Custom modules are imported lazily inside the session-state init blocks
+# below, and pandas inside the execution path, so reruns that don't need
+# them skip the import machinery entirely.
+
+# Check LLM judge availability without importing it - the module (and the
+# HTTP stack it pulls in) is only loaded once an API key is actually provided
+import importlib.util
+LLM_JUDGE_AVAILABLE = importlib.util.find_spec('llm_judge') is not None
+
+# Cached schema reads - keyed on the manager's version token so Streamlit
+# serves the dicts from memory instead of rebuilding them on every rerun.
+# The version is bumped by SchemaManager whenever the schema is (re)loaded.
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_schema(version: int) -> Dict:
+    return st.session_state.schema_manager.get_schema()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_stats(version: int) -> Dict:
+    return st.session_state.schema_manager.get_table_statistics()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_sample_queries(version: int) -> list:
+    return st.session_state.schema_manager.get_sample_queries()
+
+# Background worker pool so parse+generate doesn't block the script thread;
+# the rest of the page keeps rendering while the query is processed.
+# cache_resource makes it a real process-wide pool - a module-level
+# instance would be rebuilt on every rerun, leaking a worker pair each time.
+@st.cache_resource(show_spinner=False)
+def _get_worker_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=2)
+
+def _parse_and_generate(ctx, nl: str, schema_version: int, user_id: str, company_name: str):
+    """Run the cached parse+generate pipeline on a worker thread"""
+    # Attach the Streamlit script-run context so session state and the
+    # cache_data wrappers work from the worker thread
+    add_script_run_ctx(threading.current_thread(), ctx)
+    parsed_result = _cached_parse(nl, schema_version, user_id, company_name)
+    sql_result = _cached_generate(nl, schema_version, user_id, company_name)
+    return parsed_result, sql_result
+
+# Report-type detection - one compiled case-insensitive alternation whose
+# group names are the report types, so classification is m.lastgroup with
+# no lowercased copy of the query and no keyword->type mapping dict
+_REPORT_RE = re.compile(
+    r'(?P<trial_balance>trial balance)'
+    r'|(?P<stock_summary>stock summary|inventory report)'
+    r'|(?P<payroll_summary>payroll|salary)'
+    r'|(?P<gst_report>gst)',
+    re.I
+)
+
+# Currency columns are picked out of result sets by name with one compiled
+# regex pass instead of three substring checks per column
+_MONEY_RE = re.compile(r'amount|balance|value', re.I)
+
+# Execution result cache - re-running the exact same SQL with the same
+# parameters (repeat Execute clicks, page refreshes) is served from memory
+# instead of hitting SQLite again. Keyed on the schema version too, and
+# cleared on schema reload, so reloaded data is never masked by stale hits.
+@st.cache_data(ttl=300, max_entries=256, show_spinner=False)
+def _cached_execute(sql: str, params_key: str, schema_version: int, _connection, _parameters) -> Dict:
+    return st.session_state.executor.execute(sql, _connection, _parameters)
+
+def _execute_sql(sql: str, params_key: str, schema_version: int, connection, parameters) -> Dict:
+    """Cache repeated SELECTs; writes always reach the database
+
+    The user can edit the SQL to a single-statement INSERT/UPDATE/DELETE
+    before executing - serving a repeat of those from cache would skip
+    the write and report stale rows_affected.
+    """
+    if sql.lstrip().upper().startswith('SELECT'):
+        return _cached_execute(sql, params_key, schema_version, connection, parameters)
+    result = st.session_state.executor.execute(sql, connection, parameters)
+    # The write changed data the cached SELECTs may cover, and data writes
+    # don't bump schema_version - drop the cache so they re-read
+    _cached_execute.clear()
+    return result
+
+# Result rows -> DataFrame, cached on (sql, params) so reruns after an
+# execute reuse the frame instead of re-running pandas dtype inference
+# over every row. The rows themselves are excluded from the cache key.
+@st.cache_data(ttl=600, max_entries=50, show_spinner=False)
+def _rows_to_df(sql: str, params_key: str, _rows, _columns=None):
+    import pandas as pd
+    # Row tuples + explicit columns skip the per-row dict key scans that
+    # list-of-dict input costs
+    return pd.DataFrame.from_records(_rows, columns=_columns)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _df_to_csv_bytes(df) -> bytes:
+    """Build CSV export bytes once per result set instead of per rerun
+
+    Writes into a BytesIO in chunks rather than materializing the whole
+    CSV as a Python string first, so peak memory is one copy, not two.
+    """
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding='utf-8', chunksize=10000)
+    return buf.getvalue()
+
+# Keep at most this many history entries in session state; older ones are
+# spilled to disk so long sessions don't grow rerun/diff cost without bound.
+_HISTORY_LIMIT = 50
+_HISTORY_FILE = '.history.jsonl'
+
+def _append_history(query_log: Dict):
+    """Append to in-memory history, spilling the oldest entry to disk past the cap"""
+    st.session_state.query_history.append(query_log)
+    st.session_state.query_total += 1
+    if query_log.get('ai_judgment'):
+        st.session_state.ai_eval_count += 1
+    if len(st.session_state.query_history) > _HISTORY_LIMIT:
+        old = st.session_state.query_history.popleft()
+        try:
+            with open(_HISTORY_FILE, 'a') as f:
+                f.write(json.dumps(old, default=str) + '\n')
+        except Exception:
+            pass  # History archival is best-effort
+
+# Filler words stripped during canonicalization. Deliberately excludes
+# 'show'/'all' and other words the parser keys on for action and column
+# detection - removing those would change parse results, not just the key.
+_FILLER_RE = re.compile(r'\b(please|me|the|a|an)\b')
+_WS_RE = re.compile(r'\s+')
+# Capturing split keeps quoted literals as their own segments
+_QUOTED_SPLIT_RE = re.compile(r"('[^']*')")
+
+def _normalize_nl(query: str) -> str:
+    """Canonicalize NL input so equivalent phrasings share a cache key
 
-# Try to import LLM judge, but don't fail if it's not available
-try:
+    Quoted literals are passed through untouched - stripping fillers or
+    collapsing whitespace inside them would rewrite condition values
+    ('The Acme Company' must stay intact), not just the cache key.
+    """
+    parts = _QUOTED_SPLIT_RE.split(query.strip().lower())
+    for i in range(0, len(parts), 2):  # even indices are outside quotes
+        parts[i] = _WS_RE.sub(' ', _FILLER_RE.sub('', parts[i]))
+    return ''.join(parts).strip()
+
+# Parse/generate result caches - repeated sample-query clicks and reruns with
+# identical NL input become dict lookups instead of full parse+generate passes.
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_parse(nl: str, schema_version: int, user_id: str, company_name: str):
+    return st.session_state.parser.parse(
+        nl, _cached_schema(schema_version), user_id, company_name
+    )
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_generate(nl: str, schema_version: int, user_id: str, company_name: str) -> Dict:
+    parsed_result = _cached_parse(nl, schema_version, user_id, company_name)
+    return st.session_state.sql_generator.generate(
+        parsed_result, _cached_schema(schema_version)
+    )
+
+def _judge_in_background(ctx, nl_query: str, sql: str, schema_version: int) -> Dict:
+    """Run the cached judge call on a worker thread"""
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return _cached_judge(nl_query, sql, schema_version)
+
+def _prewarm_sample_queries():
+    """Precompute parse+SQL for the fixed sample queries in the background
+
+    The six samples are known as soon as the schema loads, so fill the
+    parse/generate caches for them up front - clicking one then serves
+    the result from memory instead of running the pipeline.
+    """
+    ctx = get_script_run_ctx()
+    version = st.session_state.schema_manager.version
+    user = st.session_state.current_user
+    company = st.session_state.current_company
+    for q in _cached_sample_queries(version)[:6]:
+        _get_worker_pool().submit(_parse_and_generate, ctx, _normalize_nl(q), version, user, company)
+
+# Process-wide singletons behind st.cache_resource - one instance shared by
+# every session/tab instead of a fresh copy per session, and construction
+# (DB setup, pattern compilation, feedback-file load) happens exactly once.
+@st.cache_resource(show_spinner=False)
+def _get_feedback_manager():
+    from feedback_manager import FeedbackManager
+    return FeedbackManager()
+
+@st.cache_resource(show_spinner=False)
+def _get_schema_manager():
+    from schema_manager import SchemaManager
+    return SchemaManager()
+
+@st.cache_resource(show_spinner=False)
+def _get_parser():
+    from query_parser import NaturalLanguageParser
+    return NaturalLanguageParser()
+
+@st.cache_resource(show_spinner=False)
+def _get_sql_generator():
+    from sql_generator import SQLGenerator
+    return SQLGenerator()
+
+@st.cache_resource(show_spinner=False)
+def _get_executor():
+    from query_executor import QueryExecutor
+    return QueryExecutor()
+
+@st.cache_resource(show_spinner=False)
+def _get_llm_judge(api_key: str):
     from llm_judge import GroqLLMJudge
-    LLM_JUDGE_AVAILABLE = True
-except ImportError as e:
-    print(f"LLM Judge not available: {e}")
-    LLM_JUDGE_AVAILABLE = False
-    GroqLLMJudge = None
+    return GroqLLMJudge(api_key=api_key)
+
+class _JudgeBatcher:
+    """Coalesce concurrent judge requests into one batched Groq call
+
+    Requests arriving within a short window are drained together and sent
+    as a single multi-pair prompt; a lone request falls through to the
+    normal single-query path. Under multi-user load this turns N parallel
+    round-trips into one.
+    """
+    MAX_BATCH = 8
+    WINDOW_S = 0.05
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []  # (judge, nl, sql, schema, Future)
+
+    def submit(self, judge, nl_query: str, sql: str, schema: Dict) -> Dict:
+        fut = Future()
+        with self._lock:
+            self._pending.append((judge, nl_query, sql, schema, fut))
+            if len(self._pending) == 1:
+                # Dedicated drain thread: submitters may themselves be
+                # worker-pool threads blocked on their future, so draining
+                # through the shared pool could deadlock it
+                threading.Thread(target=self._drain, daemon=True).start()
+        return fut.result()
+
+    def _drain(self):
+        time.sleep(self.WINDOW_S)
+        with self._lock:
+            batch = self._pending[:self.MAX_BATCH]
+            self._pending = self._pending[self.MAX_BATCH:]
+            if self._pending:
+                threading.Thread(target=self._drain, daemon=True).start()
+        if not batch:
+            return
+        judge, _, _, schema, _ = batch[0]
+        try:
+            if len(batch) == 1:
+                _, nl_query, sql, _, fut = batch[0]
+                fut.set_result(judge.judge_query_quality(nl_query, sql, schema))
+            else:
+                results = judge.judge_query_quality_batch(
+                    [(nl, s) for _, nl, s, _, _ in batch], schema
+                )
+                for (*_, fut), result in zip(batch, results):
+                    fut.set_result(result)
+        except Exception as e:
+            for *_, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+@st.cache_resource(show_spinner=False)
+def _get_judge_batcher() -> _JudgeBatcher:
+    return _JudgeBatcher()
+
+class _FeedbackBuffer:
+    """Buffer user ratings and flush them to the judge in batches
+
+    Each thumbs click previously rewrote the judge's learning file; now
+    ratings accumulate in memory and are written 16 at a time (or at
+    interpreter exit), one file write per batch.
+    """
+    FLUSH_AT = 16
+
+    def __init__(self):
+        self._items = []
+        self._judge = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add(self, judge, natural_query: str, sql_query: str,
+            rating: str, comments: str = ""):
+        with self._lock:
+            self._judge = judge
+            self._items.append((natural_query, sql_query, rating, comments))
+            if len(self._items) >= self.FLUSH_AT:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._items and self._judge:
+            try:
+                self._judge.provide_user_feedback_batch(self._items)
+            except Exception as e:
+                print(f"Error flushing feedback batch: {e}")
+            self._items = []
+
+@st.cache_resource(show_spinner=False)
+def _get_feedback_buffer() -> _FeedbackBuffer:
+    return _FeedbackBuffer()
+
+# Persistent judge cache - judgments survive process restarts, so repeats
+# across sessions skip the Groq round-trip (and its token cost) entirely.
+_JUDGE_DB = 'cache/judge.db'
+
+@st.cache_resource(show_spinner=False)
+def _get_judge_cache_db():
+    os.makedirs(os.path.dirname(_JUDGE_DB), exist_ok=True)
+    conn = sqlite3.connect(_JUDGE_DB, check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS judgments ("
+        "nl_hash TEXT, sql_hash TEXT, schema_version INTEGER, "
+        "judgment_json TEXT, ts TEXT, "
+        "PRIMARY KEY (nl_hash, sql_hash, schema_version))"
+    )
+    return conn
+
+def _judge_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode()).hexdigest()[:16]
+
+class _JudgeUnavailableError(RuntimeError):
+    """Raised for failed judgments so cache_data never memoizes them"""
+
+# Pre-execution judgments are deterministic in (query, sql, schema), so
+# repeated Generate/Judge clicks become cache hits instead of Groq
+# round-trips. Post-execution judgments include result data and stay live.
+# cache_data serves in-process repeats; the SQLite layer behind it serves
+# repeats across restarts. Failures raise instead of returning, so a
+# transient Groq outage is retried on the next click rather than pinned
+# for the TTL.
+@st.cache_data(ttl=3600, max_entries=1000, show_spinner=False)
+def _cached_judge(nl_query: str, sql: str, schema_version: int) -> Dict:
+    db = _get_judge_cache_db()
+    nl_hash, sql_hash = _judge_hash(nl_query), _judge_hash(sql)
+    row = db.execute(
+        "SELECT judgment_json FROM judgments "
+        "WHERE nl_hash = ? AND sql_hash = ? AND schema_version = ?",
+        (nl_hash, sql_hash, schema_version)
+    ).fetchone()
+    if row:
+        return json.loads(row[0])
+
+    judgment = _get_judge_batcher().submit(
+        st.session_state.llm_judge, nl_query, sql, _cached_schema(schema_version)
+    )
+    if not judgment.get('success'):
+        raise _JudgeUnavailableError(
+            judgment.get('error') or 'LLM judgment failed')
+    db.execute(
+        "INSERT OR REPLACE INTO judgments VALUES (?, ?, ?, ?, ?)",
+        (nl_hash, sql_hash, schema_version,
+         json.dumps(judgment), datetime.now().isoformat())
+    )
+    db.commit()
+    return judgment
 
 # Initialize session state
 if 'query_history' not in st.session_state:
-    st.session_state.query_history = []
+    st.session_state.query_history = deque()
+if 'query_total' not in st.session_state:
+    st.session_state.query_total = 0
+# Running counters so footer metrics stay O(1) instead of re-scanning history
+if 'success_count' not in st.session_state:
+    st.session_state.success_count = 0
+if 'fail_count' not in st.session_state:
+    st.session_state.fail_count = 0
+if 'records_fetched' not in st.session_state:
+    st.session_state.records_fetched = 0
+if 'ai_eval_count' not in st.session_state:
+    st.session_state.ai_eval_count = 0
+# Session state holds references to the shared instances so existing
+# st.session_state.* call sites keep working unchanged
 if 'feedback_manager' not in st.session_state:
-    st.session_state.feedback_manager = FeedbackManager()
+    st.session_state.feedback_manager = _get_feedback_manager()
 if 'schema_manager' not in st.session_state:
-    st.session_state.schema_manager = SchemaManager()
+    st.session_state.schema_manager = _get_schema_manager()
 if 'parser' not in st.session_state:
-    st.session_state.parser = NaturalLanguageParser()
+    st.session_state.parser = _get_parser()
 if 'sql_generator' not in st.session_state:
-    st.session_state.sql_generator = SQLGenerator()
+    st.session_state.sql_generator = _get_sql_generator()
 if 'executor' not in st.session_state:
-    st.session_state.executor = QueryExecutor()
+    st.session_state.executor = _get_executor()
 if 'current_user' not in st.session_state:
     st.session_state.current_user = "demo_user"
 if 'current_company' not in st.session_state:
     st.session_state.current_company = "Demo Company Ltd"
 
+# Prewarm the sample-query caches on first start too - SchemaManager
+# auto-loads the schema in __init__, so waiting for the manual reload
+# button would leave the first session's sample clicks cold
+if 'sample_prewarm_done' not in st.session_state:
+    st.session_state.sample_prewarm_done = True
+    if _cached_schema(st.session_state.schema_manager.version):
+        _prewarm_sample_queries()
+
 # Initialize LLM Judge (only if available and API key is provided)
 if 'llm_judge' not in st.session_state:
     try:
@@ -52,7 +421,7 @@ if 'llm_judge' not in st.session_state:
             )
             
             if groq_api_key:
-                st.session_state.llm_judge = GroqLLMJudge(api_key=groq_api_key)
+                st.session_state.llm_judge = _get_llm_judge(groq_api_key)
                 st.session_state.llm_enabled = True
             else:
                 st.session_state.llm_judge = None
@@ -80,6 +449,109 @@ st.title(title)
 st.markdown("### Convert natural language queries to SQL for Tally ERP database" + 
            (" with LLM-powered quality assessment" if st.session_state.get('llm_enabled', False) else ""))
 
+# Schema browser as a fragment - accordion clicks rerun just this
+# subtree instead of the whole script.
+@st.fragment
+def _render_schema_browser():
+    """Render database statistics and the schema accordion (if loaded)"""
+    schema = _cached_schema(st.session_state.schema_manager.version)
+    if not schema:
+        return
+    # Show database statistics with error handling
+    try:
+        stats = _cached_stats(st.session_state.schema_manager.version)
+
+        st.subheader("📈 Database Statistics")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Total Tables", len(schema))
+        with col2:
+            total_records = sum(stat.get('row_count', 0) for stat in stats.values() if isinstance(stat, dict))
+            st.metric("Total Records", total_records)
+
+        # Schema browser
+        st.subheader("🗂️ Schema Browser")
+
+        # Group tables by type (partition is cached per schema load)
+        master_tables, transaction_tables, other_tables = \
+            st.session_state.schema_manager.get_partitioned_schema()
+
+        # Manual accordion: expander bodies always execute even when
+        # collapsed, so render only the group the user has opened.
+        open_group = st.session_state.get('open_schema_group')
+
+        # Master Tables
+        if master_tables:
+            if st.button("📋 Master Tables", key="grp_master"):
+                st.session_state.open_schema_group = \
+                    None if open_group == 'master' else 'master'
+                st.rerun(scope="fragment")
+            if open_group == 'master':
+                for table_name, table_info in master_tables.items():
+                    st.markdown(f"**{table_name}**")
+                    st.write(f"Description: {table_info.get('description', 'No description')}")
+
+                    # Safe access to stats
+                    table_stats = stats.get(table_name, {})
+                    row_count = table_stats.get('row_count', 0) if isinstance(table_stats, dict) else 0
+                    st.write(f"Records: {row_count}")
+
+                    # One markdown delta for all columns instead of one
+                    # st.text message per column
+                    col_count = len(table_info['columns'])
+                    cols_md = "  \n".join(
+                        f"• {col['name']} ({col['type']})" for col in table_info['columns'][:5]
+                    )
+                    if col_count > 5:
+                        cols_md += f"  \n... and {col_count - 5} more columns"
+                    st.markdown("Key Columns:  \n" + cols_md)
+                    st.markdown("---")
+
+        # Transaction Tables
+        if transaction_tables:
+            if st.button("💱 Transaction Tables", key="grp_txn"):
+                st.session_state.open_schema_group = \
+                    None if open_group == 'txn' else 'txn'
+                st.rerun(scope="fragment")
+            if open_group == 'txn':
+                for table_name, table_info in transaction_tables.items():
+                    st.markdown(f"**{table_name}**")
+                    st.write(f"Description: {table_info.get('description', 'No description')}")
+
+                    table_stats = stats.get(table_name, {})
+                    row_count = table_stats.get('row_count', 0) if isinstance(table_stats, dict) else 0
+                    st.write(f"Records: {row_count}")
+
+                    cols_md = "  \n".join(
+                        f"• {col['name']} ({col['type']})" for col in table_info['columns'][:5]
+                    )
+                    st.markdown("Key Columns:  \n" + cols_md)
+                    st.markdown("---")
+
+        # Other Tables
+        if other_tables:
+            if st.button("⚙️ Configuration Tables", key="grp_other"):
+                st.session_state.open_schema_group = \
+                    None if open_group == 'other' else 'other'
+                st.rerun(scope="fragment")
+            if open_group == 'other':
+                for table_name, table_info in other_tables.items():
+                    st.markdown(f"**{table_name}**")
+
+                    table_stats = stats.get(table_name, {})
+                    row_count = table_stats.get('row_count', 0) if isinstance(table_stats, dict) else 0
+                    st.write(f"Records: {row_count}")
+
+                    cols_md = "  \n".join(
+                        f"• {col['name']} ({col['type']})" for col in table_info['columns'][:3]
+                    )
+                    st.markdown("Key Columns:  \n" + cols_md)
+                    st.markdown("---")
+
+    except Exception as e:
+        st.error(f"Error loading database statistics: {str(e)}")
+        st.info("The database may not be properly initialized. Try reloading the schema.")
+
 # Sidebar with configuration
 with st.sidebar:
     st.header("🔧 Configuration")
@@ -95,7 +567,7 @@ with st.sidebar:
         
         if api_key_input and not st.session_state.llm_enabled:
             try:
-                st.session_state.llm_judge = GroqLLMJudge(api_key=api_key_input)
+                st.session_state.llm_judge = _get_llm_judge(api_key_input)
                 st.session_state.llm_enabled = True
                 st.success("✅ LLM Judge enabled!")
                 st.rerun()
@@ -156,7 +628,7 @@ with st.sidebar:
     st.header("📊 Tally ERP Database")
     
     # Database status
-    schema = st.session_state.schema_manager.get_schema()
+    schema = _cached_schema(st.session_state.schema_manager.version)
     if schema:
         st.success("✅ Database Schema Loaded")
     else:
@@ -167,90 +639,20 @@ with st.sidebar:
         with st.spinner("Loading Tally ERP database structure..."):
             try:
                 st.session_state.schema_manager.load_tally_schema()
+                # Version bump already keys new reads; drop the stale
+                # entries too instead of letting them age out via TTL
+                _cached_schema.clear()
+                _cached_stats.clear()
+                _cached_sample_queries.clear()
+                _rows_to_df.clear()
+                _cached_execute.clear()
+                _prewarm_sample_queries()
                 st.success("✅ Tally ERP schema loaded successfully!")
                 st.rerun()
             except Exception as e:
                 st.error(f"❌ Error loading schema: {str(e)}")
     
-    # Display current schema (only if loaded)
-    schema = st.session_state.schema_manager.get_schema()
-    if schema:
-        # Show database statistics with error handling
-        try:
-            stats = st.session_state.schema_manager.get_table_statistics()
-            
-            st.subheader("📈 Database Statistics")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Total Tables", len(schema))
-            with col2:
-                total_records = sum(stat.get('row_count', 0) for stat in stats.values() if isinstance(stat, dict))
-                st.metric("Total Records", total_records)
-            
-            # Schema browser
-            st.subheader("🗂️ Schema Browser")
-            
-            # Group tables by type
-            master_tables = {k: v for k, v in schema.items() if k.startswith('mst_')}
-            transaction_tables = {k: v for k, v in schema.items() if k.startswith('trn_')}
-            other_tables = {k: v for k, v in schema.items() if not k.startswith(('mst_', 'trn_'))}
-            
-            # Master Tables
-            if master_tables:
-                with st.expander("📋 Master Tables", expanded=False):
-                    for table_name, table_info in master_tables.items():
-                        st.markdown(f"**{table_name}**")
-                        st.write(f"Description: {table_info.get('description', 'No description')}")
-                        
-                        # Safe access to stats
-                        table_stats = stats.get(table_name, {})
-                        row_count = table_stats.get('row_count', 0) if isinstance(table_stats, dict) else 0
-                        st.write(f"Records: {row_count}")
-                        
-                        st.markdown("Key Columns:")
-                        key_columns = [col for col in table_info['columns'][:5]]  # Show first 5
-                        for col in key_columns:
-                            st.text(f"• {col['name']} ({col['type']})")
-                        
-                        if len(table_info['columns']) > 5:
-                            st.text(f"... and {len(table_info['columns'])-5} more columns")
-                        st.markdown("---")
-            
-            # Transaction Tables
-            if transaction_tables:
-                with st.expander("💱 Transaction Tables", expanded=False):
-                    for table_name, table_info in transaction_tables.items():
-                        st.markdown(f"**{table_name}**")
-                        st.write(f"Description: {table_info.get('description', 'No description')}")
-                        
-                        table_stats = stats.get(table_name, {})
-                        row_count = table_stats.get('row_count', 0) if isinstance(table_stats, dict) else 0
-                        st.write(f"Records: {row_count}")
-                        
-                        st.markdown("Key Columns:")
-                        key_columns = [col for col in table_info['columns'][:5]]
-                        for col in key_columns:
-                            st.text(f"• {col['name']} ({col['type']})")
-                        st.markdown("---")
-            
-            # Other Tables  
-            if other_tables:
-                with st.expander("⚙️ Configuration Tables", expanded=False):
-                    for table_name, table_info in other_tables.items():
-                        st.markdown(f"**{table_name}**")
-                        
-                        table_stats = stats.get(table_name, {})
-                        row_count = table_stats.get('row_count', 0) if isinstance(table_stats, dict) else 0
-                        st.write(f"Records: {row_count}")
-                        
-                        st.markdown("Key Columns:")
-                        for col in table_info['columns'][:3]:
-                            st.text(f"• {col['name']} ({col['type']})")
-                        st.markdown("---")
-                        
-        except Exception as e:
-            st.error(f"Error loading database statistics: {str(e)}")
-            st.info("The database may not be properly initialized. Try reloading the schema.")
+    _render_schema_browser()
 
 # Main content area
 col1, col2 = st.columns([2, 1])
@@ -261,14 +663,22 @@ with col1:
     
     if schema:
         try:
-            sample_queries = st.session_state.schema_manager.get_sample_queries()
-            
-            # Create columns for sample query buttons
-            query_cols = st.columns(3)
-            for i, query in enumerate(sample_queries[:6]):  # Show first 6
-                with query_cols[i % 3]:
-                    if st.button(query, key=f"sample_{i}", help="Click to use this query"):
-                        st.session_state.sample_query = query
+            sample_queries = _cached_sample_queries(st.session_state.schema_manager.version)
+
+            # One pills widget instead of six buttons in a column grid -
+            # a single widget delta and one session_state entry
+            choice = st.pills(
+                "Sample queries",
+                sample_queries[:6],  # Show first 6
+                key="sample_pick",
+                label_visibility="collapsed",
+                help="Click to use this query"
+            )
+            # Pills keep their selection across reruns; only treat a change
+            # as a new pick so the user can still edit the query text
+            if choice and choice != st.session_state.get('last_sample_pick'):
+                st.session_state.sample_query = choice
+                st.session_state.last_sample_pick = choice
         except Exception as e:
             st.warning(f"Error loading sample queries: {e}")
     else:
@@ -309,29 +719,20 @@ with col1:
                 if user_query:
                     try:
                         # Detect report type from query
-                        query_lower = user_query.lower()
-                        if 'trial balance' in query_lower:
-                            report_type = 'trial_balance'
-                        elif 'stock summary' in query_lower or 'inventory report' in query_lower:
-                            report_type = 'stock_summary'
-                        elif 'payroll' in query_lower or 'salary' in query_lower:
-                            report_type = 'payroll_summary'
-                        elif 'gst' in query_lower:
-                            report_type = 'gst_report'
-                        else:
-                            report_type = 'custom'
+                        report_match = _REPORT_RE.search(user_query)
+                        report_type = report_match.lastgroup if report_match else 'custom'
                         
                         with st.spinner("Generating specialized report..."):
-                            parsed_result = st.session_state.parser.parse(
-                                user_query, 
-                                st.session_state.schema_manager.get_schema(),
+                            parsed_result = _cached_parse(
+                                _normalize_nl(user_query),
+                                st.session_state.schema_manager.version,
                                 st.session_state.current_user,
                                 st.session_state.current_company
                             )
-                            
+
                             if report_type != 'custom':
                                 sql_query = st.session_state.sql_generator.generate_tally_report_query(
-                                    report_type, parsed_result, st.session_state.schema_manager.get_schema()
+                                    report_type, parsed_result, schema
                                 )
                                 sql_result = {
                                     'query': sql_query,
@@ -340,9 +741,11 @@ with col1:
                                     'confidence': 0.95
                                 }
                             else:
-                                sql_result = st.session_state.sql_generator.generate(
-                                    parsed_result,
-                                    st.session_state.schema_manager.get_schema()
+                                sql_result = _cached_generate(
+                                    _normalize_nl(user_query),
+                                    st.session_state.schema_manager.version,
+                                    st.session_state.current_user,
+                                    st.session_state.current_company
                                 )
                             
                             st.session_state.current_sql = sql_result
@@ -362,61 +765,92 @@ with col1:
         
         if st.session_state.llm_enabled:
             with col_btn4:
-                if st.button("🤖 AI Judge", disabled=not hasattr(st.session_state, 'current_sql')):
-                    if hasattr(st.session_state, 'current_sql') and hasattr(st.session_state, 'current_query'):
-                        with st.spinner("AI Judge evaluating query..."):
-                            try:
-                                judgment = st.session_state.llm_judge.judge_query_quality(
-                                    st.session_state.current_query,
-                                    st.session_state.current_sql['query'],
-                                    st.session_state.schema_manager.get_schema()
-                                )
-                                st.session_state.current_judgment = judgment
-                            except Exception as e:
-                                st.error(f"AI Judge evaluation failed: {str(e)}")
+                if st.button("🤖 AI Judge", disabled=not 'current_sql' in st.session_state):
+                    if 'current_sql' in st.session_state and 'current_query' in st.session_state:
+                        # Stream the judgment so feedback starts appearing at
+                        # time-to-first-token instead of after the full response
+                        try:
+                            judge = st.session_state.llm_judge
+                            stream = judge.judge_query_quality_stream(
+                                st.session_state.current_query,
+                                st.session_state.current_sql['query'],
+                                schema
+                            )
+                            with st.expander("🤖 AI Judge (live)", expanded=True):
+                                streamed_text = st.write_stream(stream)
+                            st.session_state.current_judgment = judge.parse_streamed_judgment(
+                                st.session_state.current_query,
+                                st.session_state.current_sql['query'],
+                                streamed_text
+                            )
+                        except Exception as e:
+                            st.error(f"AI Judge evaluation failed: {str(e)}")
         
-        # Process generate SQL button
+        # Process generate SQL button - submit parse+generate to the worker
+        # pool and poll the future on subsequent reruns so the UI stays live
         if generate_clicked and user_query:
-            try:
-                with st.spinner("Parsing your query..."):
-                    # Parse the natural language query
-                    parsed_result = st.session_state.parser.parse(
-                        user_query, 
-                        st.session_state.schema_manager.get_schema(),
-                        st.session_state.current_user,
-                        st.session_state.current_company
-                    )
-                    
-                    # Generate SQL
-                    sql_result = st.session_state.sql_generator.generate(
-                        parsed_result,
-                        st.session_state.schema_manager.get_schema()
-                    )
-                    
+            future = _get_worker_pool().submit(
+                _parse_and_generate,
+                get_script_run_ctx(),
+                _normalize_nl(user_query),
+                st.session_state.schema_manager.version,
+                st.session_state.current_user,
+                st.session_state.current_company
+            )
+            st.session_state.pending_future = future
+            st.session_state.pending_query = user_query
+
+        if 'pending_future' in st.session_state:
+            future = st.session_state.pending_future
+            if future.done():
+                pending_query = st.session_state.pending_query
+                del st.session_state.pending_future
+                del st.session_state.pending_query
+                try:
+                    parsed_result, sql_result = future.result()
+
                     # Store in session state for confirmation
                     st.session_state.current_sql = sql_result
-                    st.session_state.current_query = user_query
+                    st.session_state.current_query = pending_query
                     st.session_state.current_parsed = parsed_result
-                    
-                    # Auto-judge if LLM is enabled
+
+                    # Auto-judge if LLM is enabled - submitted to the worker
+                    # pool so the generated SQL renders immediately instead
+                    # of blocking on the Groq round-trip
                     if st.session_state.llm_enabled:
-                        with st.spinner("AI Judge evaluating query..."):
-                            try:
-                                judgment = st.session_state.llm_judge.judge_query_quality(
-                                    user_query,
-                                    sql_result['query'],
-                                    st.session_state.schema_manager.get_schema()
-                                )
-                                st.session_state.current_judgment = judgment
-                            except Exception as e:
-                                st.warning(f"AI Judge evaluation failed: {str(e)}")
-            
-            except Exception as e:
-                st.error(f"Error processing query: {str(e)}")
-                st.info("Please check your query and try again. Make sure the database schema is loaded.")
+                        st.session_state.judgment_future = _get_worker_pool().submit(
+                            _judge_in_background,
+                            get_script_run_ctx(),
+                            pending_query,
+                            sql_result['query'],
+                            st.session_state.schema_manager.version
+                        )
+
+                except Exception as e:
+                    st.error(f"Error processing query: {str(e)}")
+                    st.info("Please check your query and try again. Make sure the database schema is loaded.")
+            else:
+                st.info("⏳ Parsing your query...")
+                time.sleep(0.2)
+                st.rerun()
+
+        # Poll the background judgment; the SQL is already on screen while
+        # this completes
+        if 'judgment_future' in st.session_state:
+            judgment_future = st.session_state.judgment_future
+            if judgment_future.done():
+                del st.session_state.judgment_future
+                try:
+                    st.session_state.current_judgment = judgment_future.result()
+                except Exception as e:
+                    st.warning(f"AI Judge evaluation failed: {str(e)}")
+            else:
+                st.caption("🤖 AI Judge evaluating in the background...")
+                time.sleep(0.2)
+                st.rerun()
     
     # Display generated SQL and assumptions
-    if hasattr(st.session_state, 'current_sql'):
+    if 'current_sql' in st.session_state:
         st.header("🔧 Generated SQL Query")
         
         # Show confidence and AI scores
@@ -449,7 +883,7 @@ with col1:
         if st.session_state.llm_enabled:
             with col_judge:
                 # Display AI Judge results if available
-                if hasattr(st.session_state, 'current_judgment') and st.session_state.current_judgment.get('success'):
+                if 'current_judgment' in st.session_state and st.session_state.current_judgment.get('success'):
                     judgment = st.session_state.current_judgment
                     ai_score = judgment.get('score', 0.0)
                     st.metric("AI Judge Score", f"{ai_score:.0%}")
@@ -514,7 +948,7 @@ with col1:
         # Add this debug section in your app.py after query generation
 # and before the "Execute Query" button
 
-if hasattr(st.session_state, 'current_sql'):
+if 'current_sql' in st.session_state:
     # Debug Information Section
     with st.expander("🔍 Debug Information", expanded=False):
         st.subheader("Query Analysis")
@@ -544,7 +978,7 @@ if hasattr(st.session_state, 'current_sql'):
                 st.error(f"❌ Parameter mismatch: Expected {param_count}, got {provided_params}")
             
             st.write("**Parsed Query Info:**")
-            if hasattr(st.session_state, 'current_parsed'):
+            if 'current_parsed' in st.session_state:
                 parsed = st.session_state.current_parsed
                 st.text(f"Action: {parsed.action}")
                 st.text(f"Tables: {parsed.tables}")
@@ -631,9 +1065,12 @@ if st.button("🧪 Test Simple Query"):
                     if not connection:
                         st.error("❌ Database connection not available. Please reload the schema.")
                     else:
-                        # Execute the query with parameters
-                        result = st.session_state.executor.execute(
+                        # Execute the query with parameters (SELECTs are
+                        # cached on sql+params, so repeat clicks skip SQLite)
+                        result = _execute_sql(
                             edited_sql,
+                            json.dumps(parameters, default=str),
+                            st.session_state.schema_manager.version,
                             connection,
                             parameters
                         )
@@ -644,7 +1081,7 @@ if st.button("🧪 Test Simple Query"):
                                 post_execution_judgment = st.session_state.llm_judge.judge_query_quality(
                                     st.session_state.current_query,
                                     edited_sql,
-                                    st.session_state.schema_manager.get_schema(),
+                                    schema,
                                     result
                                 )
                                 st.session_state.execution_judgment = post_execution_judgment
@@ -657,23 +1094,43 @@ if st.button("🧪 Test Simple Query"):
                             # Display results
                             if result['data']:
                                 st.subheader("📊 Query Results")
-                                df = pd.DataFrame(result['data'])
-                                
-                                # Format numeric columns
-                                for col in df.columns:
-                                    if df[col].dtype in ['float64', 'int64']:
-                                        if 'amount' in col.lower() or 'balance' in col.lower() or 'value' in col.lower():
-                                            df[col] = df[col].apply(lambda x: f"₹{x:,.2f}" if pd.notnull(x) else "")
-                                
-                                st.dataframe(df, use_container_width=True)
+                                import pandas as pd
+                                df = _rows_to_df(
+                                    edited_sql,
+                                    json.dumps(parameters, default=str),
+                                    result['data'],
+                                    result.get('columns')
+                                )
+
+                                # Format currency at render time via Styler
+                                # instead of rewriting columns to strings -
+                                # no per-row Python formatting pass, and the
+                                # columns stay numeric (sortable, raw in CSV)
+                                num_cols = df.select_dtypes(include=['number']).columns
+                                money_cols = [c for c in num_cols if _MONEY_RE.search(c)]
+
+                                # Cap the rendered rows - shipping the whole
+                                # result over the websocket freezes the UI on
+                                # big exports; the CSV below has everything
+                                display_df = df
+                                if len(df) > 1000:
+                                    st.info(f"Showing first 1,000 of {len(df):,} rows. Use Download CSV for the full result.")
+                                    display_df = df.head(1000)
+
+                                if money_cols:
+                                    st.dataframe(
+                                        display_df.style.format({c: "₹{:,.2f}" for c in money_cols}, na_rep=""),
+                                        use_container_width=True
+                                    )
+                                else:
+                                    st.dataframe(display_df, use_container_width=True)
                                 
                                 # Show export options
                                 col_exp1, col_exp2, col_exp3 = st.columns(3)
                                 with col_exp1:
-                                    csv = df.to_csv(index=False)
                                     st.download_button(
                                         label="📥 Download CSV",
-                                        data=csv,
+                                        data=_df_to_csv_bytes(df),
                                         file_name=f"tally_query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                                         mime="text/csv"
                                     )
@@ -682,7 +1139,7 @@ if st.button("🧪 Test Simple Query"):
                                     st.info(f"Found {len(df)} records")
                                 
                                 with col_exp3:
-                                    if hasattr(st.session_state, 'execution_judgment'):
+                                    if 'execution_judgment' in st.session_state:
                                         exec_judgment = st.session_state.execution_judgment
                                         exec_score = exec_judgment.get('score', 0.0)
                                         st.metric("Post-Exec AI Score", f"{exec_score:.0%}")
@@ -708,8 +1165,10 @@ if st.button("🧪 Test Simple Query"):
                                     query_log['ai_judgment'] = st.session_state.get('current_judgment', {})
                                     query_log['execution_judgment'] = st.session_state.get('execution_judgment', {})
                                 
-                                st.session_state.query_history.append(query_log)
-                                
+                                _append_history(query_log)
+                                st.session_state.success_count += 1
+                                st.session_state.records_fetched += len(df)
+
                                 # Update feedback manager
                                 st.session_state.feedback_manager.add_feedback(
                                     st.session_state.current_query,
@@ -721,24 +1180,31 @@ if st.button("🧪 Test Simple Query"):
                                 # User feedback section for AI learning
                                 if st.session_state.llm_enabled:
                                     st.subheader("📝 Help AI Learn")
-                                    feedback_col1, feedback_col2 = st.columns(2)
-                                    
-                                    with feedback_col1:
-                                        user_rating = st.selectbox(
-                                            "Rate this query result:",
-                                            ["", "positive", "neutral", "negative"],
-                                            help="Your feedback helps improve the AI judge"
-                                        )
-                                    
-                                    with feedback_col2:
-                                        user_comments = st.text_input(
-                                            "Comments (optional):",
-                                            placeholder="Any specific feedback about the query or results"
-                                        )
-                                    
-                                    if st.button("Submit Feedback") and user_rating:
+                                    # Form coalesces the rating/comment edits
+                                    # into one rerun on submit instead of a
+                                    # full rerun per widget change
+                                    with st.form("feedback_form"):
+                                        feedback_col1, feedback_col2 = st.columns(2)
+
+                                        with feedback_col1:
+                                            user_rating = st.selectbox(
+                                                "Rate this query result:",
+                                                ["", "positive", "neutral", "negative"],
+                                                help="Your feedback helps improve the AI judge"
+                                            )
+
+                                        with feedback_col2:
+                                            user_comments = st.text_input(
+                                                "Comments (optional):",
+                                                placeholder="Any specific feedback about the query or results"
+                                            )
+
+                                        feedback_submitted = st.form_submit_button("Submit Feedback")
+
+                                    if feedback_submitted and user_rating:
                                         try:
-                                            st.session_state.llm_judge.provide_user_feedback(
+                                            _get_feedback_buffer().add(
+                                                st.session_state.llm_judge,
                                                 st.session_state.current_query,
                                                 edited_sql,
                                                 user_rating,
@@ -766,8 +1232,9 @@ if st.button("🧪 Test Simple Query"):
                             if st.session_state.llm_enabled:
                                 query_log['ai_judgment'] = st.session_state.get('current_judgment', {})
                             
-                            st.session_state.query_history.append(query_log)
-                            
+                            _append_history(query_log)
+                            st.session_state.fail_count += 1
+
                 except Exception as e:
                     st.error(f"❌ Execution error: {str(e)}")
         
@@ -790,7 +1257,7 @@ if st.button("🧪 Test Simple Query"):
         if st.session_state.llm_enabled:
             with col1_4:
                 if st.button("🔧 Improve Query"):
-                    if hasattr(st.session_state, 'current_judgment'):
+                    if 'current_judgment' in st.session_state:
                         judgment = st.session_state.current_judgment
                         if judgment.get('alternative_approach'):
                             st.subheader("🔧 AI Suggested Improvement")
@@ -802,14 +1269,19 @@ if st.button("🧪 Test Simple Query"):
                         else:
                             st.info("No alternative approach suggested by AI judge.")
 
-with col2:
+# History pane as a fragment - feedback/quick-action clicks rerun only this
+# subtree, and typing in the main pane no longer re-renders the expanders.
+@st.fragment
+def _render_history():
     # Query history with AI insights
     st.header("📜 Query History")
     
     if st.session_state.query_history:
         # Show last 5 queries
-        for i, query in enumerate(reversed(st.session_state.query_history[-5:])):
-            with st.expander(f"Query {len(st.session_state.query_history) - i}"):
+        history = st.session_state.query_history
+        total = st.session_state.query_total
+        for i, query in enumerate(islice(reversed(history), 5)):
+            with st.expander(f"Query {total - i}"):
                 st.text(f"⏰ {query['timestamp'][:19]}")
                 st.text(f"💬 {query['natural_query'][:50]}...")
                 
@@ -836,7 +1308,8 @@ with col2:
                         # Record positive feedback for AI learning
                         if st.session_state.llm_enabled:
                             try:
-                                st.session_state.llm_judge.provide_user_feedback(
+                                _get_feedback_buffer().add(
+                                    st.session_state.llm_judge,
                                     query['natural_query'],
                                     query['sql_query'],
                                     'positive'
@@ -849,7 +1322,8 @@ with col2:
                         # Record negative feedback for AI learning
                         if st.session_state.llm_enabled:
                             try:
-                                st.session_state.llm_judge.provide_user_feedback(
+                                _get_feedback_buffer().add(
+                                    st.session_state.llm_judge,
                                     query['natural_query'],
                                     query['sql_query'],
                                     'negative'
@@ -877,46 +1351,49 @@ with col2:
             st.session_state.sample_query = query
             st.rerun()
 
-# Footer with enhanced statistics
-st.markdown("---")
-if st.session_state.llm_enabled:
-    col_f1, col_f2, col_f3, col_f4, col_f5 = st.columns(5)
-else:
-    col_f1, col_f2, col_f3, col_f4 = st.columns(4)
-
-with col_f1:
-    total_queries = len(st.session_state.query_history)
-    st.metric("Total Queries", total_queries)
-
-with col_f2:
-    successful_queries = sum(1 for q in st.session_state.query_history if q['success'])
-    st.metric("Successful Queries", successful_queries)
-
-with col_f3:
-    if total_queries > 0:
-        success_rate = (successful_queries / total_queries) * 100
-        st.metric("Success Rate", f"{success_rate:.1f}%")
-    else:
-        st.metric("Success Rate", "N/A")
+with col2:
+    _render_history()
 
-with col_f4:
-    if st.session_state.query_history:
-        total_records = sum(q.get('result_count', 0) for q in st.session_state.query_history if q['success'])
-        st.metric("Records Fetched", total_records)
+# Footer metrics as a fragment for the same reason - they only change when a
+# query actually runs, not on every main-pane widget event.
+@st.fragment
+def _render_footer_metrics():
+    if st.session_state.llm_enabled:
+        col_f1, col_f2, col_f3, col_f4, col_f5 = st.columns(5)
     else:
-        st.metric("Records Fetched", 0)
-
-if st.session_state.llm_enabled:
-    with col_f5:
-        # AI metrics
-        if st.session_state.query_history:
-            ai_evaluated = sum(1 for q in st.session_state.query_history if q.get('ai_judgment'))
-            st.metric("AI Evaluated", ai_evaluated)
+        col_f1, col_f2, col_f3, col_f4 = st.columns(4)
+
+    with col_f1:
+        total_queries = st.session_state.query_total
+        st.metric("Total Queries", total_queries)
+
+    with col_f2:
+        successful_queries = st.session_state.success_count
+        st.metric("Successful Queries", successful_queries)
+
+    with col_f3:
+        if total_queries > 0:
+            success_rate = (successful_queries / total_queries) * 100
+            st.metric("Success Rate", f"{success_rate:.1f}%")
         else:
-            st.metric("AI Evaluated", 0)
+            st.metric("Success Rate", "N/A")
+
+    with col_f4:
+        st.metric("Records Fetched", st.session_state.records_fetched)
+
+    if st.session_state.llm_enabled:
+        with col_f5:
+            # AI metrics
+            st.metric("AI Evaluated", st.session_state.ai_eval_count)
+
+# Footer with enhanced statistics
+st.markdown("---")
+_render_footer_metrics()
 
 # Help section
-with st.expander("❓ Help & Tips", expanded=False):
+@st.cache_data(show_spinner=False)
+def _help_content(llm_enabled: bool) -> str:
+    """Assemble the help markdown once per llm_enabled value"""
     help_content = """
     ### 🚀 How to use this Tally ERP Text-to-SQL Agent:
     
@@ -943,7 +1420,7 @@ with st.expander("❓ Help & Tips", expanded=False):
     - Database must be loaded before generating queries
     """
     
-    if st.session_state.llm_enabled:
+    if llm_enabled:
         help_content += """
     
     **🤖 AI Judge Features:**
@@ -958,22 +1435,27 @@ with st.expander("❓ Help & Tips", expanded=False):
     - **0.0-0.6**: AI Concern (Needs improvement)
     """
     
-    st.markdown(help_content)
+    return help_content
 
-# Developer info
-st.markdown("---")
-footer_text = "🔧 Tally ERP Text-to-SQL Agent"
-if st.session_state.llm_enabled:
-    footer_text += " with AI Judge | Built with Streamlit + Groq LLM"
-else:
-    footer_text += " | Built with Streamlit"
-footer_text += " | Secure • Multi-tenant • Production-ready"
-
-st.markdown(
-    f"""
+@st.cache_data(show_spinner=False)
+def _footer_html(llm_enabled: bool) -> str:
+    """Assemble the footer HTML once per llm_enabled value"""
+    footer_text = "🔧 Tally ERP Text-to-SQL Agent"
+    if llm_enabled:
+        footer_text += " with AI Judge | Built with Streamlit + Groq LLM"
+    else:
+        footer_text += " | Built with Streamlit"
+    footer_text += " | Secure • Multi-tenant • Production-ready"
+
+    return f"""
     <div style='text-align: center; color: #666; font-size: 12px;'>
     {footer_text}
     </div>
-    """, 
-    unsafe_allow_html=True
-)
+    """
+
+with st.expander("❓ Help & Tips", expanded=False):
+    st.markdown(_help_content(st.session_state.llm_enabled))
+
+# Developer info
+st.markdown("---")
+st.markdown(_footer_html(st.session_state.llm_enabled), unsafe_allow_html=True)
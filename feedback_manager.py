@@ -1,35 +1,361 @@
+import atexit
+import functools
+import hashlib
 import json
+import mmap
 import os
 import re
-from typing import Dict, List, Optional
+import string
+import sys
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Optional
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+
+import pandas as pd
+
+# Per-phrase AI score history is only needed for the recent-vs-older trend
+# comparison, so keep a bounded window instead of an ever-growing list
+_SCORE_HISTORY_LEN = 50
+
+# Soft cap on distinct SQL patterns remembered per phrase
+_MAX_SQL_PATTERNS = 32
+
+def _normalize_query(query: str) -> str:
+    """Lowercase a query once and intern the result.
+
+    The same query is phrase-extracted and key-hashed by several helpers
+    per feedback event; normalizing at the entry point means one .lower()
+    per event, and interning makes the repeated cache/dict hashing cheap.
+    """
+    return sys.intern(query.lower())
+
+def _query_key(natural_query: str) -> str:
+    """Stable digest key for a natural query.
+
+    Built-in hash() is salted per interpreter start, so keys written in one
+    session were unfindable in the next and every lookup fell through to the
+    similarity scan. blake2b gives a stable 64-bit key across runs.
+    """
+    return hashlib.blake2b(natural_query.encode('utf-8'), digest_size=8).hexdigest()
+
+# Correction keys written by older versions were str(hash(query)) - plain
+# (possibly negative) integers rather than hex digests
+_LEGACY_KEY_RE = re.compile(r'^-?\d+$')
+
+def _json_default(obj):
+    """Serialize the in-memory set-backed dedup collections as sorted lists"""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    return list(obj)
+
+# orjson parses and serializes large nested documents several times faster
+# than stdlib json; fall back transparently when it isn't installed. Both
+# paths speak bytes so the file I/O can stay in binary mode.
+try:
+    import orjson
+
+    def _loads(data: bytes) -> Dict:
+        if not isinstance(data, (str, bytes, bytearray, memoryview)):
+            data = memoryview(data)  # zero-copy view over mmap buffers
+        return orjson.loads(data)
+
+    def _dumps(obj: Dict) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=_json_default)
+    def _dumps_line(obj: Dict) -> bytes:
+        return orjson.dumps(obj, default=_json_default)
+except ImportError:
+    def _loads(data: bytes) -> Dict:
+        if not isinstance(data, (str, bytes, bytearray)):
+            data = bytes(data)  # json.loads rejects mmap buffers
+        return json.loads(data)
+
+    def _dumps(obj: Dict) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False,
+                          default=_json_default).encode('utf-8')
+
+    def _dumps_line(obj: Dict) -> bytes:
+        return json.dumps(obj, ensure_ascii=False,
+                          default=_json_default).encode('utf-8')
+
+# Append-only event lists live in a JSON Lines side file so each event
+# writes only its own bytes; the main JSON file keeps just the fields that
+# are mutated in place (patterns, corrections, ai_learning_patterns)
+_EVENT_FIELDS = ('sessions', 'llm_evaluations', 'user_ai_feedback_correlation')
+
+class SessionRec(NamedTuple):
+    """Compact in-memory session record.
+
+    A NamedTuple is a fraction of the size of the equivalent dict, which
+    matters once session history reaches tens of thousands of entries.
+    Field names mirror the on-disk JSON keys so records round-trip via
+    _asdict() at the serialization boundary.
+    """
+    timestamp: str
+    natural_query: str
+    sql_query: str
+    feedback_type: str
+    correction: Optional[str]
+    ai_judgment: Optional[Dict]
+
+def _session_from_dict(entry: Dict) -> SessionRec:
+    return SessionRec(
+        timestamp=entry.get('timestamp', ''),
+        natural_query=entry.get('natural_query', ''),
+        sql_query=entry.get('sql_query', ''),
+        # Only three distinct values exist; intern so they share storage
+        feedback_type=sys.intern(entry.get('feedback_type', '')),
+        correction=entry.get('correction'),
+        ai_judgment=entry.get('ai_judgment'),
+    )
+
+# Single alternation matching string literals and numbers so SQL
+# generalization makes one pass over the query instead of three re.sub calls
+_SQL_LITERAL_RE = re.compile(r"'[^']*'|\"[^\"]*\"|\b\d+\b")
+
+def _sql_literal_repl(m) -> str:
+    ch = m.group(0)[0]
+    if ch == "'":
+        return "'<STRING>'"
+    if ch == '"':
+        return '"<STRING>"'
+    return '<NUMBER>'
+
+# Common words to drop when extracting key phrases
+_STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at',
+                         'to', 'for', 'of', 'with', 'by'})
+
+# Strips punctuation in one C-level pass, so "ledgers?" and "ledgers"
+# land on the same pattern key
+_PUNCT_TBL = str.maketrans('', '', string.punctuation)
+
+@functools.lru_cache(maxsize=4096)
+def _extract_key_phrases_cached(query: str) -> tuple:
+    """Extract significant words and bigrams from a query, memoized.
+
+    The same query string is phrase-extracted several times per feedback
+    event (pattern updates, confidence lookup, similarity search), so the
+    split/filter/bigram work is cached on the raw string.
+    """
+    words = [w for w in query.lower().translate(_PUNCT_TBL).split()
+             if w not in _STOP_WORDS]
+    if not words:
+        return ()
+    return tuple(words) + tuple(a + ' ' + b for a, b in zip(words, words[1:]))
 
 class FeedbackManager:
+    # Flush to disk after this many unsaved events or this many seconds,
+    # whichever comes first - rewriting the whole JSON blob per event is
+    # O(history) and dominates add_feedback on long sessions
+    FLUSH_EVERY = 20
+    FLUSH_INTERVAL_S = 30.0
+
     def __init__(self, feedback_file: str = "feedback_log.json"):
         self.feedback_file = feedback_file
+        self.events_file = os.path.splitext(feedback_file)[0] + '_events.jsonl'
+        self._events_fh = None
         self.feedback_data = self._load_feedback()
         self.pattern_corrections = defaultdict(list)
+        # Memoized get_confidence_adjustment results, keyed on
+        # (query, patterns version) so entries age out when patterns change
         self.confidence_adjustments = {}
+        self._patterns_version = 0
+        self._build_corrected_index()
+        self._init_counters()
+        self._dirty_count = 0
+        self._last_flush = time.monotonic()
+        atexit.register(self.flush)
+
+    def __enter__(self) -> 'FeedbackManager':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        """Write any buffered feedback to disk immediately"""
+        if self._dirty_count:
+            self._write_feedback()
         
     def _load_feedback(self) -> Dict:
         """Load existing feedback from file"""
+        data = None
         if os.path.exists(self.feedback_file):
             try:
-                with open(self.feedback_file, 'r') as f:
-                    data = json.load(f)
-                    # Ensure new fields exist for LLM integration
-                    if 'llm_evaluations' not in data:
-                        data['llm_evaluations'] = []
-                    if 'ai_learning_patterns' not in data:
-                        data['ai_learning_patterns'] = {}
-                    if 'user_ai_feedback_correlation' not in data:
-                        data['user_ai_feedback_correlation'] = []
-                    return data
+                # Map the snapshot instead of reading it through the IO
+                # buffer - the parser consumes the pages directly, skipping
+                # one full copy of the file (with orjson; the stdlib
+                # fallback still has to take a bytes copy)
+                with open(self.feedback_file, 'rb') as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        data = _loads(mm)
+                    finally:
+                        mm.close()
+                # Ensure new fields exist for LLM integration
+                if 'sessions' not in data:
+                    data['sessions'] = []
+                if 'llm_evaluations' not in data:
+                    data['llm_evaluations'] = []
+                if 'ai_learning_patterns' not in data:
+                    data['ai_learning_patterns'] = {}
+                if 'user_ai_feedback_correlation' not in data:
+                    data['user_ai_feedback_correlation'] = []
+                self._normalize_pattern_sets(data)
             except:
-                return self._initialize_feedback_structure()
-        return self._initialize_feedback_structure()
+                data = None
+        if data is None:
+            data = self._initialize_feedback_structure()
+        self._load_events(data)
+        data['sessions'] = [_session_from_dict(s) for s in data['sessions']]
+        self._migrate_legacy_correction_keys(data)
+        return data
+
+    def _load_events(self, data: Dict) -> None:
+        """Stream the append-only event log into the in-memory lists"""
+        if os.path.exists(self.events_file):
+            # The event log is authoritative for append-only fields; a file
+            # written by an older version may still carry stale inline copies
+            for field in _EVENT_FIELDS:
+                data[field] = []
+            with open(self.events_file, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        event = _loads(line)
+                        data[event['kind']].append(event['entry'])
+                    except Exception:
+                        continue  # torn tail line from a crash mid-append
+        elif any(data[field] for field in _EVENT_FIELDS):
+            # Migrate lists stored inline by older versions into the log
+            with open(self.events_file, 'ab') as f:
+                for field in _EVENT_FIELDS:
+                    for entry in data[field]:
+                        f.write(_dumps_line({'kind': field, 'entry': entry}) + b'\n')
+
+    def _append_event(self, kind: str, entry: Dict) -> None:
+        """Append one event record to the JSONL log - O(entry) bytes"""
+        if self._events_fh is None:
+            self._events_fh = open(self.events_file, 'ab')
+        self._events_fh.write(_dumps_line({'kind': kind, 'entry': entry}) + b'\n')
+        self._events_fh.flush()
     
+    @staticmethod
+    def _migrate_legacy_correction_keys(data: Dict) -> None:
+        """Re-key corrections written under salted hash() keys
+
+        The original queries behind legacy integer keys can't be recovered
+        from the keys themselves, but corrected sessions carry the same
+        wrong/correct pairs, so the mapping is rebuilt from those.
+        """
+        corrections = data['corrections']
+        legacy_keys = [k for k in corrections if _LEGACY_KEY_RE.match(k)]
+        if not legacy_keys:
+            return
+
+        for session in data['sessions']:
+            if session.feedback_type == 'corrected' and session.correction:
+                entries = corrections.setdefault(
+                    _query_key(_normalize_query(session.natural_query)), [])
+                if not any(e['wrong'] == session.sql_query and
+                           e['correct'] == session.correction for e in entries):
+                    entries.append({
+                        'wrong': session.sql_query,
+                        'correct': session.correction,
+                        'timestamp': session.timestamp,
+                        'ai_judgment': session.ai_judgment
+                    })
+
+        for key in legacy_keys:
+            del corrections[key]
+
+    def _build_corrected_index(self) -> None:
+        """Index corrected sessions by key phrase for similarity lookups
+
+        get_similar_corrections only needs sessions sharing at least one
+        phrase with the query, so a phrase -> session-index map lets it
+        Jaccard-score a handful of candidates instead of scanning every
+        session. Each session's phrase set is stored as an int bitmask over
+        a shared vocabulary, turning the per-candidate Jaccard into two
+        bitwise ops and two popcounts.
+        """
+        self._phrase_to_corrected_sessions: Dict[str, set] = defaultdict(set)
+        self._vocab: Dict[str, int] = {}
+        # idx -> (phrase bitmask, popcount of that mask)
+        self._session_masks: Dict[int, tuple] = {}
+        for idx, session in enumerate(self.feedback_data['sessions']):
+            if session.feedback_type == 'corrected' and session.correction:
+                self._index_corrected_session(idx, session)
+
+    def _init_counters(self) -> None:
+        """Seed running statistics counters from the loaded history
+
+        get_statistics used to re-scan sessions, evaluations and
+        correlations on every call; one pass here plus incremental updates
+        in the add_* methods makes it O(1).
+        """
+        self._feedback_counts = defaultdict(int)
+        for session in self.feedback_data['sessions']:
+            self._feedback_counts[session.feedback_type] += 1
+
+        self._ai_score_sum = 0.0
+        self._ai_score_count = 0
+        for eval_data in self.feedback_data['llm_evaluations']:
+            if eval_data['ai_judgment'].get('success'):
+                self._ai_score_sum += eval_data['ai_judgment'].get('score', 0.5)
+                self._ai_score_count += 1
+
+        self._correlation_sum = sum(
+            c['correlation_score']
+            for c in self.feedback_data['user_ai_feedback_correlation'])
+
+    def _index_corrected_session(self, idx: int, session: SessionRec) -> None:
+        """Add one corrected session to the phrase index"""
+        phrases = frozenset(self._extract_key_phrases(session.natural_query))
+        mask = self._phrase_mask(phrases)
+        # Precompute the popcount; the union size in the Jaccard loop is
+        # then derived arithmetically without building the OR mask
+        self._session_masks[idx] = (mask, mask.bit_count())
+        for phrase in phrases:
+            self._phrase_to_corrected_sessions[phrase].add(idx)
+
+    def _phrase_mask(self, phrases) -> int:
+        """Build an int bitmask for a phrase set over the shared vocabulary"""
+        vocab = self._vocab
+        mask = 0
+        for phrase in phrases:
+            bit = vocab.get(phrase)
+            if bit is None:
+                bit = len(vocab)
+                vocab[phrase] = bit
+            mask |= 1 << bit
+        return mask
+
+    @staticmethod
+    def _normalize_pattern_sets(data: Dict) -> None:
+        """Convert dedup collections from on-disk lists to in-memory sets
+
+        `if x not in list` membership checks are O(n) per insert; sets make
+        the dedup O(1). JSON still stores lists - _write_feedback converts
+        back at serialize time.
+        """
+        for pattern_data in data['patterns'].values():
+            if 'common_sql_patterns' in pattern_data:
+                pattern_data['common_sql_patterns'] = set(pattern_data['common_sql_patterns'])
+            if 'failure_reasons' in pattern_data:
+                pattern_data['failure_reasons'] = set(pattern_data['failure_reasons'])
+        for pattern_data in data['ai_learning_patterns'].values():
+            if 'common_suggestions' in pattern_data:
+                pattern_data['common_suggestions'] = set(pattern_data['common_suggestions'])
+            if 'common_issues' in pattern_data:
+                pattern_data['common_issues'] = set(pattern_data['common_issues'])
+            if 'score_history' in pattern_data:
+                pattern_data['score_history'] = deque(pattern_data['score_history'],
+                                                      maxlen=_SCORE_HISTORY_LEN)
+
     def _initialize_feedback_structure(self) -> Dict:
         """Initialize feedback data structure with LLM support"""
         return {
@@ -49,24 +375,33 @@ class FeedbackManager:
         feedback_type: 'positive', 'negative', 'corrected'
         ai_judgment: LLM judge evaluation results
         """
-        feedback_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'natural_query': natural_query,
-            'sql_query': sql_query,
-            'feedback_type': feedback_type,
-            'correction': correction,
-            'ai_judgment': ai_judgment
-        }
-        
+        feedback_entry = SessionRec(
+            timestamp=datetime.now().isoformat(),
+            natural_query=natural_query,
+            sql_query=sql_query,
+            feedback_type=sys.intern(feedback_type),
+            correction=correction,
+            ai_judgment=ai_judgment,
+        )
+
         self.feedback_data['sessions'].append(feedback_entry)
-        
-        # Update patterns based on feedback
+        self._append_event('sessions', feedback_entry._asdict())
+        self._feedback_counts[feedback_type] += 1
+
+        # Keep the corrected-session phrase index current
+        if feedback_type == 'corrected' and correction:
+            self._index_corrected_session(len(self.feedback_data['sessions']) - 1,
+                                          feedback_entry)
+
+        # Update patterns based on feedback, lowercasing the query once
+        # here rather than in every helper downstream
+        nq_norm = _normalize_query(natural_query)
         if feedback_type == 'positive':
-            self._update_positive_pattern(natural_query, sql_query, ai_judgment)
+            self._update_positive_pattern(nq_norm, sql_query, ai_judgment)
         elif feedback_type == 'corrected' and correction:
-            self._update_correction_pattern(natural_query, sql_query, correction, ai_judgment)
+            self._update_correction_pattern(nq_norm, sql_query, correction, ai_judgment)
         elif feedback_type == 'negative':
-            self._update_negative_pattern(natural_query, sql_query, ai_judgment)
+            self._update_negative_pattern(nq_norm, sql_query, ai_judgment)
         
         # Store AI judgment correlation
         if ai_judgment:
@@ -87,15 +422,20 @@ class FeedbackManager:
         }
         
         self.feedback_data['llm_evaluations'].append(llm_eval_entry)
-        
+        self._append_event('llm_evaluations', llm_eval_entry)
+        if ai_judgment.get('success'):
+            self._ai_score_sum += ai_judgment.get('score', 0.5)
+            self._ai_score_count += 1
+
         # Extract AI learning patterns
-        self._extract_ai_patterns(natural_query, ai_judgment)
+        self._extract_ai_patterns(_normalize_query(natural_query), ai_judgment)
         
         self._save_feedback()
     
     def _update_positive_pattern(self, natural_query: str, sql_query: str, 
                                 ai_judgment: Optional[Dict] = None) -> None:
         """Update patterns for successful queries with AI insights"""
+        self._patterns_version += 1
         # Extract key phrases from natural query
         key_phrases = self._extract_key_phrases(natural_query)
         
@@ -104,84 +444,86 @@ class FeedbackManager:
                 self.feedback_data['patterns'][phrase] = {
                     'success_count': 0,
                     'fail_count': 0,
-                    'common_sql_patterns': [],
+                    'common_sql_patterns': set(),
                     'ai_success_scores': [],
                     'avg_ai_score': 0.0
                 }
-            
+
             pattern_data = self.feedback_data['patterns'][phrase]
             pattern_data['success_count'] += 1
-            
-            # Store SQL pattern
-            sql_pattern = self._generalize_sql_pattern(sql_query)
-            if sql_pattern not in pattern_data['common_sql_patterns']:
-                pattern_data['common_sql_patterns'].append(sql_pattern)
+
+            # Store SQL pattern, capped so one noisy phrase can't grow
+            # an unbounded collection
+            common = pattern_data['common_sql_patterns']
+            if len(common) < _MAX_SQL_PATTERNS:
+                common.add(self._generalize_sql_pattern(sql_query))
             
             # Store AI judgment if available
             if ai_judgment and ai_judgment.get('success'):
                 ai_score = ai_judgment.get('score', 0.5)
                 pattern_data['ai_success_scores'].append(ai_score)
-                
-                # Update average AI score
-                pattern_data['avg_ai_score'] = sum(pattern_data['ai_success_scores']) / len(pattern_data['ai_success_scores'])
+
+                # Update average AI score incrementally - no history re-scan
+                n = len(pattern_data['ai_success_scores'])
+                pattern_data['avg_ai_score'] += (ai_score - pattern_data['avg_ai_score']) / n
     
     def _update_negative_pattern(self, natural_query: str, sql_query: str,
                                 ai_judgment: Optional[Dict] = None) -> None:
         """Update patterns for negative feedback with AI insights"""
+        self._patterns_version += 1
         key_phrases = self._extract_key_phrases(natural_query)
-        
+
+        # AI-derived failure reasons are identical for every phrase, so
+        # build them once up front - and not at all when the judgment is
+        # missing or unsuccessful
+        failure_reasons = []
+        if ai_judgment and ai_judgment.get('success'):
+            missing_elements = ai_judgment.get('missing_elements')
+            security_issues = ai_judgment.get('security_issues')
+            ai_feedback = ai_judgment.get('feedback', '')
+
+            if missing_elements:
+                failure_reasons.extend('Missing: ' + elem for elem in missing_elements)
+            if security_issues:
+                failure_reasons.extend('Security: ' + issue for issue in security_issues)
+            if ai_feedback and len(ai_feedback) > 20:
+                failure_reasons.append('AI Feedback: ' + ai_feedback[:100] + '...')
+
         for phrase in key_phrases:
             if phrase not in self.feedback_data['patterns']:
                 self.feedback_data['patterns'][phrase] = {
                     'success_count': 0,
                     'fail_count': 0,
-                    'common_sql_patterns': [],
+                    'common_sql_patterns': set(),
                     'ai_success_scores': [],
                     'avg_ai_score': 0.0,
-                    'failure_reasons': []
+                    'failure_reasons': set()
                 }
-            
+
             pattern_data = self.feedback_data['patterns'][phrase]
             pattern_data['fail_count'] += 1
-            
-            # Store AI judgment insights
-            if ai_judgment and ai_judgment.get('success'):
-                if 'failure_reasons' not in pattern_data:
-                    pattern_data['failure_reasons'] = []
-                
-                # Extract failure reasons from AI feedback
-                ai_feedback = ai_judgment.get('feedback', '')
-                missing_elements = ai_judgment.get('missing_elements', [])
-                security_issues = ai_judgment.get('security_issues', [])
-                
-                failure_reasons = []
-                if missing_elements:
-                    failure_reasons.extend([f"Missing: {elem}" for elem in missing_elements])
-                if security_issues:
-                    failure_reasons.extend([f"Security: {issue}" for issue in security_issues])
-                if ai_feedback and len(ai_feedback) > 20:
-                    failure_reasons.append(f"AI Feedback: {ai_feedback[:100]}...")
-                
-                pattern_data['failure_reasons'].extend(failure_reasons)
+
+            if failure_reasons:
+                # Patterns created by the positive path predate this key;
+                # the same AI blurb often repeats, so dedup via the set
+                pattern_data.setdefault('failure_reasons', set()).update(failure_reasons)
     
     def _update_correction_pattern(self, natural_query: str, 
                                   wrong_sql: str, correct_sql: str,
                                   ai_judgment: Optional[Dict] = None) -> None:
         """Update patterns for corrected queries with AI insights"""
-        # Store correction mapping
-        query_hash = hash(natural_query)
-        
-        if str(query_hash) not in self.feedback_data['corrections']:
-            self.feedback_data['corrections'][str(query_hash)] = []
-        
+        self._patterns_version += 1
+        # Store correction mapping under a stable digest key
+        query_key = _query_key(natural_query)
+
         correction_entry = {
             'wrong': wrong_sql,
             'correct': correct_sql,
             'timestamp': datetime.now().isoformat(),
             'ai_judgment': ai_judgment
         }
-        
-        self.feedback_data['corrections'][str(query_hash)].append(correction_entry)
+
+        self.feedback_data['corrections'].setdefault(query_key, []).append(correction_entry)
         
         # Update fail count for patterns
         key_phrases = self._extract_key_phrases(natural_query)
@@ -203,6 +545,8 @@ class FeedbackManager:
             }
             
             self.feedback_data['user_ai_feedback_correlation'].append(correlation_entry)
+            self._append_event('user_ai_feedback_correlation', correlation_entry)
+            self._correlation_sum += correlation_entry['correlation_score']
     
     def _calculate_correlation_score(self, user_feedback: str, ai_judgment: Dict) -> float:
         """Calculate correlation between user feedback and AI judgment"""
@@ -222,7 +566,8 @@ class FeedbackManager:
         """Extract patterns from AI judgments for learning"""
         if not ai_judgment.get('success'):
             return
-        
+
+        self._patterns_version += 1
         key_phrases = self._extract_key_phrases(natural_query)
         ai_score = ai_judgment.get('score', 0.5)
         
@@ -231,95 +576,122 @@ class FeedbackManager:
                 self.feedback_data['ai_learning_patterns'][phrase] = {
                     'evaluation_count': 0,
                     'avg_ai_score': 0.0,
-                    'score_history': [],
-                    'common_suggestions': [],
-                    'common_issues': []
+                    'score_history': deque(maxlen=_SCORE_HISTORY_LEN),
+                    'common_suggestions': set(),
+                    'common_issues': set()
                 }
             
             pattern_data = self.feedback_data['ai_learning_patterns'][phrase]
             pattern_data['evaluation_count'] += 1
             pattern_data['score_history'].append(ai_score)
-            
-            # Update average
-            pattern_data['avg_ai_score'] = sum(pattern_data['score_history']) / len(pattern_data['score_history'])
+
+            # Update average incrementally over the full evaluation count;
+            # score_history itself is a bounded deque kept only for the
+            # recent-vs-older trend in _get_ai_learning_insights
+            n = pattern_data['evaluation_count']
+            pattern_data['avg_ai_score'] += (ai_score - pattern_data['avg_ai_score']) / n
             
             # Store common suggestions and issues
             suggestions = ai_judgment.get('suggestions', [])
             missing_elements = ai_judgment.get('missing_elements', [])
             
-            for suggestion in suggestions:
-                if suggestion not in pattern_data['common_suggestions']:
-                    pattern_data['common_suggestions'].append(suggestion)
-            
-            for issue in missing_elements:
-                if issue not in pattern_data['common_issues']:
-                    pattern_data['common_issues'].append(issue)
+            pattern_data['common_suggestions'].update(suggestions)
+            pattern_data['common_issues'].update(missing_elements)
     
     def get_confidence_adjustment(self, natural_query: str) -> float:
         """Get confidence adjustment based on past feedback and AI patterns"""
+        # Rerankers call this repeatedly for the same query; reuse the
+        # result until the pattern tables actually change
+        natural_query = _normalize_query(natural_query)
+        cache_key = (natural_query, self._patterns_version)
+        cached = self.confidence_adjustments.get(cache_key)
+        if cached is not None:
+            return cached
+
         key_phrases = self._extract_key_phrases(natural_query)
         
         total_adjustment = 1.0
         ai_adjustment = 1.0
-        
-        # User feedback based adjustment
+
+        patterns = self.feedback_data['patterns']
+        ai_patterns = self.feedback_data['ai_learning_patterns']
+
+        # Single pass over the phrases, one .get per table instead of
+        # separate loops with 'in' + '[]' double lookups
         for phrase in key_phrases:
-            if phrase in self.feedback_data['patterns']:
-                pattern = self.feedback_data['patterns'][phrase]
+            # User feedback based adjustment
+            pattern = patterns.get(phrase)
+            if pattern is not None:
                 success_rate = pattern['success_count'] / (pattern['success_count'] + pattern['fail_count'] + 1)
-                
+
                 # Adjust confidence based on success rate
                 if success_rate > 0.8:
                     total_adjustment *= 1.1
                 elif success_rate < 0.5:
                     total_adjustment *= 0.8
-                
+
                 # Factor in AI success scores
                 if pattern.get('avg_ai_score', 0) > 0:
                     ai_factor = pattern['avg_ai_score']
                     total_adjustment *= (0.8 + 0.4 * ai_factor)  # Scale between 0.8 and 1.2
-        
-        # AI learning patterns based adjustment
-        for phrase in key_phrases:
-            if phrase in self.feedback_data['ai_learning_patterns']:
-                ai_pattern = self.feedback_data['ai_learning_patterns'][phrase]
+
+            # AI learning patterns based adjustment
+            ai_pattern = ai_patterns.get(phrase)
+            if ai_pattern is not None:
                 avg_ai_score = ai_pattern.get('avg_ai_score', 0.5)
-                
+
                 if avg_ai_score > 0.8:
                     ai_adjustment *= 1.15
                 elif avg_ai_score < 0.4:
                     ai_adjustment *= 0.7
         
         final_adjustment = (total_adjustment + ai_adjustment) / 2
-        return min(max(final_adjustment, 0.3), 1.8)  # Clamp between 0.3 and 1.8
+        final_adjustment = min(max(final_adjustment, 0.3), 1.8)  # Clamp between 0.3 and 1.8
+
+        if len(self.confidence_adjustments) > 1024:
+            self.confidence_adjustments.clear()
+        self.confidence_adjustments[cache_key] = final_adjustment
+        return final_adjustment
     
     def get_similar_corrections(self, natural_query: str) -> List[Dict]:
         """Get similar queries that were corrected with AI insights"""
-        query_hash = hash(natural_query)
-        
-        if str(query_hash) in self.feedback_data['corrections']:
-            return self.feedback_data['corrections'][str(query_hash)]
+        natural_query = _normalize_query(natural_query)
+        query_key = _query_key(natural_query)
+
+        if query_key in self.feedback_data['corrections']:
+            return self.feedback_data['corrections'][query_key]
         
-        # Look for similar queries
+        # Look for similar queries - only sessions sharing at least one
+        # phrase with the query can clear the similarity threshold, so
+        # score just the candidates from the inverted index
         similar_corrections = []
-        key_phrases = set(self._extract_key_phrases(natural_query))
-        
-        for session in self.feedback_data['sessions']:
-            if session['feedback_type'] == 'corrected' and session['correction']:
-                session_phrases = set(self._extract_key_phrases(session['natural_query']))
-                
-                # Calculate similarity
-                similarity = len(key_phrases.intersection(session_phrases)) / len(key_phrases.union(session_phrases))
-                
-                if similarity > 0.6:  # 60% similarity threshold
-                    correction_info = {
-                        'natural_query': session['natural_query'],
-                        'original_sql': session['sql_query'],
-                        'corrected_sql': session['correction'],
-                        'similarity': similarity,
-                        'ai_judgment': session.get('ai_judgment', {})
-                    }
-                    similar_corrections.append(correction_info)
+        key_phrases = frozenset(self._extract_key_phrases(natural_query))
+
+        candidates = set()
+        for phrase in key_phrases:
+            candidates |= self._phrase_to_corrected_sessions.get(phrase, set())
+
+        sessions = self.feedback_data['sessions']
+        query_mask = self._phrase_mask(key_phrases)
+        query_bits = query_mask.bit_count()
+        for idx in candidates:
+            session = sessions[idx]
+            session_mask, session_bits = self._session_masks[idx]
+
+            # Jaccard over bitmasks: one AND plus one popcount per
+            # candidate, with |A u B| = |A| + |B| - |A n B|
+            intersection = (query_mask & session_mask).bit_count()
+            similarity = intersection / (query_bits + session_bits - intersection)
+
+            if similarity > 0.6:  # 60% similarity threshold
+                correction_info = {
+                    'natural_query': session.natural_query,
+                    'original_sql': session.sql_query,
+                    'corrected_sql': session.correction,
+                    'similarity': similarity,
+                    'ai_judgment': session.ai_judgment or {}
+                }
+                similar_corrections.append(correction_info)
         
         # Sort by similarity
         similar_corrections.sort(key=lambda x: x['similarity'], reverse=True)
@@ -327,7 +699,7 @@ class FeedbackManager:
     
     def get_ai_insights_for_query(self, natural_query: str) -> Dict:
         """Get AI insights and predictions for a query based on learning data"""
-        key_phrases = self._extract_key_phrases(natural_query)
+        key_phrases = self._extract_key_phrases(_normalize_query(natural_query))
         insights = {
             'predicted_issues': [],
             'suggested_improvements': [],
@@ -338,95 +710,105 @@ class FeedbackManager:
         
         total_evaluations = 0
         total_score = 0
-        
+
+        patterns = self.feedback_data['patterns']
+        ai_patterns = self.feedback_data['ai_learning_patterns']
+
+        # Collect into sets from the start - dedup happens on insert
+        # instead of a list(set(...)) pass at the end
+        predicted_issues = set()
+        suggested_improvements = set()
+
         for phrase in key_phrases:
             # Check AI learning patterns
-            if phrase in self.feedback_data['ai_learning_patterns']:
-                ai_pattern = self.feedback_data['ai_learning_patterns'][phrase]
-                
+            ai_pattern = ai_patterns.get(phrase)
+            if ai_pattern is not None:
                 total_evaluations += ai_pattern['evaluation_count']
                 total_score += ai_pattern['avg_ai_score'] * ai_pattern['evaluation_count']
-                
+
                 # Add common issues and suggestions
-                insights['predicted_issues'].extend(ai_pattern['common_issues'][:2])
-                insights['suggested_improvements'].extend(ai_pattern['common_suggestions'][:2])
-            
+                predicted_issues.update(list(ai_pattern['common_issues'])[:2])
+                suggested_improvements.update(list(ai_pattern['common_suggestions'])[:2])
+
             # Check user feedback patterns
-            if phrase in self.feedback_data['patterns']:
-                pattern = self.feedback_data['patterns'][phrase]
-                
-                if pattern.get('failure_reasons'):
-                    insights['predicted_issues'].extend(pattern['failure_reasons'][:2])
-        
+            pattern = patterns.get(phrase)
+            if pattern is not None and pattern.get('failure_reasons'):
+                predicted_issues.update(list(pattern['failure_reasons'])[:2])
+
         # Calculate confidence prediction
         if total_evaluations > 0:
             insights['confidence_prediction'] = total_score / total_evaluations
-        
-        # Remove duplicates
-        insights['predicted_issues'] = list(set(insights['predicted_issues']))
-        insights['suggested_improvements'] = list(set(insights['suggested_improvements']))
-        
+
+        insights['predicted_issues'] = list(predicted_issues)
+        insights['suggested_improvements'] = list(suggested_improvements)
+
         return insights
     
     def _extract_key_phrases(self, query: str) -> List[str]:
         """Extract key phrases from natural language query"""
-        # Simple implementation - extract significant words and bigrams
-        words = query.lower().split()
-        
-        # Remove common words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        words = [w for w in words if w not in stop_words]
-        
-        # Extract single words and bigrams
-        phrases = words.copy()
-        
-        # Add bigrams
-        for i in range(len(words) - 1):
-            phrases.append(f"{words[i]} {words[i+1]}")
-        
-        return phrases
+        return list(_extract_key_phrases_cached(query))
     
     def _generalize_sql_pattern(self, sql_query: str) -> str:
         """Generalize SQL query to extract pattern"""
-        # Replace specific values with placeholders
-        pattern = sql_query
-        
-        # Replace string literals
-        pattern = re.sub(r"'[^']*'", "'<STRING>'", pattern)
-        pattern = re.sub(r'"[^"]*"', '"<STRING>"', pattern)
-        
-        # Replace numbers
-        pattern = re.sub(r'\b\d+\b', '<NUMBER>', pattern)
-        
-        # Replace table/column names with generic versions (simplified)
-        pattern = pattern.lower()
-        
-        return pattern
+        # Replace string literals and numbers with placeholders in one pass
+        return _SQL_LITERAL_RE.sub(_sql_literal_repl, sql_query).lower()
     
     def _save_feedback(self) -> None:
-        """Save feedback data to file"""
+        """Mark feedback dirty and flush when the batch or time budget is hit"""
+        self._dirty_count += 1
+        now = time.monotonic()
+        if (self._dirty_count >= self.FLUSH_EVERY or
+                now - self._last_flush > self.FLUSH_INTERVAL_S):
+            self._write_feedback()
+
+    def _write_feedback(self) -> None:
+        """Save feedback data to file atomically"""
         try:
-            with open(self.feedback_file, 'w') as f:
-                json.dump(self.feedback_data, f, indent=2)
+            # Serialize once and emit a single large write instead of the
+            # many tiny writes json.dump produces token by token. Write to
+            # a temp file and os.replace so a crash mid-write never leaves
+            # a truncated file that _load_feedback would reset to empty.
+            # Append-only event lists live in the JSONL log, so only the
+            # mutated dict fields are rewritten here.
+            payload = _dumps({k: v for k, v in self.feedback_data.items()
+                              if k not in _EVENT_FIELDS})
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.feedback_file) or '.',
+                suffix='.tmp'
+            )
+            try:
+                with os.fdopen(fd, 'wb', buffering=1 << 20) as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.feedback_file)
+            except Exception:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self._dirty_count = 0
+            self._last_flush = time.monotonic()
         except Exception as e:
             print(f"Error saving feedback: {e}")
     
     def get_statistics(self) -> Dict:
         """Get feedback statistics with AI metrics"""
+        # All figures come from counters maintained by the add_* methods
         total_queries = len(self.feedback_data['sessions'])
-        positive = sum(1 for s in self.feedback_data['sessions'] if s['feedback_type'] == 'positive')
-        negative = sum(1 for s in self.feedback_data['sessions'] if s['feedback_type'] == 'negative')
-        corrected = sum(1 for s in self.feedback_data['sessions'] if s['feedback_type'] == 'corrected')
-        
+        positive = self._feedback_counts['positive']
+        negative = self._feedback_counts['negative']
+        corrected = self._feedback_counts['corrected']
+
         # AI evaluation statistics
         total_ai_evals = len(self.feedback_data['llm_evaluations'])
-        ai_scores = [eval_data['ai_judgment'].get('score', 0.5) for eval_data in self.feedback_data['llm_evaluations'] 
-                    if eval_data['ai_judgment'].get('success')]
-        avg_ai_score = sum(ai_scores) / len(ai_scores) if ai_scores else 0
-        
+        avg_ai_score = (self._ai_score_sum / self._ai_score_count
+                        if self._ai_score_count else 0)
+
         # User-AI correlation analysis
-        correlations = self.feedback_data['user_ai_feedback_correlation']
-        avg_correlation = sum(c['correlation_score'] for c in correlations) / len(correlations) if correlations else 0
+        n_corr = len(self.feedback_data['user_ai_feedback_correlation'])
+        avg_correlation = self._correlation_sum / n_corr if n_corr else 0
         
         return {
             'total_queries': total_queries,
@@ -464,7 +846,7 @@ class FeedbackManager:
                     'phrase': phrase,
                     'success_rate': data['success_count'] / total,
                     'total_uses': total,
-                    'sql_patterns': data['common_sql_patterns'][:3],
+                    'sql_patterns': list(data['common_sql_patterns'])[:3],
                     'avg_ai_score': data.get('avg_ai_score', 0.0),
                     'ai_evaluation_count': len(data.get('ai_success_scores', []))
                 }
@@ -476,92 +858,103 @@ class FeedbackManager:
     
     def _get_common_corrections(self, limit: int = 5) -> List[Dict]:
         """Get most common corrections with AI analysis"""
-        correction_counts = defaultdict(int)
-        correction_details = {}
-        
+        # most_common(limit) runs a bounded heap selection instead of
+        # sorting the whole population for a top-5 answer
+        correction_counts = Counter(
+            (correction['wrong'], correction['correct'])
+            for corrections in self.feedback_data['corrections'].values()
+            for correction in corrections
+        )
+        top = correction_counts.most_common(limit)
+        top_keys = {key for key, _ in top}
+
+        # Gather AI judgment details only for the winners
+        details = {key: {'ai_judgments': [], 'common_ai_issues': set()}
+                   for key in top_keys}
         for corrections in self.feedback_data['corrections'].values():
             for correction in corrections:
                 key = (correction['wrong'], correction['correct'])
-                correction_counts[key] += 1
-                
-                if key not in correction_details:
-                    correction_details[key] = {
-                        'ai_judgments': [],
-                        'avg_ai_score_before': 0.0,
-                        'common_ai_issues': []
-                    }
-                
-                # Store AI judgment details
-                if correction.get('ai_judgment'):
-                    ai_judgment = correction['ai_judgment']
-                    correction_details[key]['ai_judgments'].append(ai_judgment)
-                    
-                    # Collect common issues identified by AI
-                    missing_elements = ai_judgment.get('missing_elements', [])
-                    correction_details[key]['common_ai_issues'].extend(missing_elements)
-        
-        # Calculate averages and prepare results
+                if key not in top_keys or not correction.get('ai_judgment'):
+                    continue
+                ai_judgment = correction['ai_judgment']
+                details[key]['ai_judgments'].append(ai_judgment)
+                details[key]['common_ai_issues'].update(
+                    ai_judgment.get('missing_elements', []))
+
         results = []
-        sorted_corrections = sorted(correction_counts.items(), key=lambda x: x[1], reverse=True)
-        
-        for (wrong, correct), count in sorted_corrections[:limit]:
-            details = correction_details[(wrong, correct)]
-            ai_judgments = details['ai_judgments']
-            
+        for (wrong, correct), count in top:
+            ai_judgments = details[(wrong, correct)]['ai_judgments']
+
             avg_ai_score = 0.0
             if ai_judgments:
                 scores = [aj.get('score', 0.5) for aj in ai_judgments if aj.get('success')]
                 avg_ai_score = sum(scores) / len(scores) if scores else 0.0
-            
+
             results.append({
                 'wrong_pattern': wrong,
                 'correct_pattern': correct,
                 'frequency': count,
                 'avg_ai_score_before': avg_ai_score,
-                'common_ai_issues': list(set(details['common_ai_issues']))[:3]
+                'common_ai_issues': list(details[(wrong, correct)]['common_ai_issues'])[:3]
             })
-        
+
         return results
     
     def _get_learning_timeline(self) -> List[Dict]:
         """Get learning progress over time with AI metrics"""
-        # Group by day
-        daily_stats = defaultdict(lambda: {
-            'positive': 0, 'negative': 0, 'corrected': 0, 
-            'ai_evaluations': 0, 'ai_scores': []
-        })
-        
-        # Process user feedback sessions
-        for session in self.feedback_data['sessions']:
-            date = session['timestamp'][:10]  # Extract date part
-            daily_stats[date][session['feedback_type']] += 1
-        
-        # Process AI evaluations
-        for eval_data in self.feedback_data['llm_evaluations']:
-            date = eval_data['timestamp'][:10]
-            daily_stats[date]['ai_evaluations'] += 1
-            
-            if eval_data['ai_judgment'].get('success'):
-                score = eval_data['ai_judgment'].get('score', 0.5)
-                daily_stats[date]['ai_scores'].append(score)
-        
-        # Calculate success rate per day
+        sessions = self.feedback_data['sessions']
+        evals = self.feedback_data['llm_evaluations']
+        if not sessions and not evals:
+            return []
+
+        # Bucket by day with pandas groupby - one C-level aggregation pass
+        # per source instead of Python-loop bucketing over every record
+        if sessions:
+            sess_df = pd.DataFrame({
+                'date': [s.timestamp[:10] for s in sessions],
+                'feedback_type': [s.feedback_type for s in sessions],
+            })
+            counts = (sess_df.groupby(['date', 'feedback_type']).size()
+                      .unstack(fill_value=0)
+                      .reindex(columns=['positive', 'negative', 'corrected'],
+                               fill_value=0))
+        else:
+            counts = pd.DataFrame(columns=['positive', 'negative', 'corrected'])
+
+        if evals:
+            # NaN for unsuccessful judgments keeps them out of the mean
+            # while 'size' still counts every evaluation
+            eval_df = pd.DataFrame({
+                'date': [e['timestamp'][:10] for e in evals],
+                'score': [e['ai_judgment'].get('score', 0.5)
+                          if e['ai_judgment'].get('success') else float('nan')
+                          for e in evals],
+            })
+            ai = eval_df.groupby('date').agg(
+                ai_evaluations=('date', 'size'),
+                avg_ai_score=('score', 'mean'))
+        else:
+            ai = pd.DataFrame(columns=['ai_evaluations', 'avg_ai_score'])
+
+        merged = counts.join(ai, how='outer').fillna(0).sort_index()
+
         timeline = []
-        for date, stats in sorted(daily_stats.items()):
-            user_total = stats['positive'] + stats['negative'] + stats['corrected']
-            success_rate = (stats['positive'] / user_total * 100) if user_total > 0 else 0
-            
-            avg_ai_score = sum(stats['ai_scores']) / len(stats['ai_scores']) if stats['ai_scores'] else 0
-            
+        for date, row in merged.iterrows():
+            positive = int(row['positive'])
+            user_total = positive + int(row['negative']) + int(row['corrected'])
+            success_rate = (positive / user_total * 100) if user_total > 0 else 0
+
             timeline.append({
                 'date': date,
                 'total_user_feedback': user_total,
                 'success_rate': success_rate,
-                'ai_evaluations': stats['ai_evaluations'],
-                'avg_ai_score': avg_ai_score,
-                **{k: v for k, v in stats.items() if k not in ['ai_scores']}
+                'ai_evaluations': int(row['ai_evaluations']),
+                'avg_ai_score': float(row['avg_ai_score']),
+                'positive': positive,
+                'negative': int(row['negative']),
+                'corrected': int(row['corrected'])
             })
-        
+
         return timeline
     
     def _get_ai_learning_insights(self) -> Dict:
@@ -574,7 +967,7 @@ class FeedbackManager:
         declining_patterns = []
         
         for phrase, data in self.feedback_data['ai_learning_patterns'].items():
-            score_history = data.get('score_history', [])
+            score_history = list(data.get('score_history', []))
             if len(score_history) >= 3:
                 recent_avg = sum(score_history[-3:]) / 3
                 older_avg = sum(score_history[:-3]) / len(score_history[:-3]) if len(score_history) > 3 else recent_avg
@@ -1,19 +1,172 @@
+import atexit
+import functools
+import mmap
 import os
 import json
+import queue
+import string
+import tempfile
+import threading
 import requests
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from collections import Counter, deque
 import re
 
+# Compiled once at import - SQL generalization runs per evaluation and
+# should not pay the re-cache lookup on every call. A single alternation
+# scans the query once instead of one pass per placeholder class.
+_RE_GEN = re.compile(r"'[^']*'|\b\d+\b")
+
+def _gen_repl(m) -> str:
+    return "'<STRING>'" if m.group(0)[0] == "'" else '<NUMBER>'
+
+# Prefer orjson for (de)serializing the learning data - several times
+# faster than stdlib json on large nested documents - with a transparent
+# stdlib fallback. Both paths speak bytes.
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_json_value(text: str, opener: str = '{'):
+    """Decode the first JSON value opening with `opener`, or None.
+
+    Replaces re.search(r'\{.*\}', ..., DOTALL) on LLM responses: the
+    greedy .* backtracks badly on malformed output, while raw_decode is
+    a single O(n) pass that also gets nested braces inside string values
+    right rather than by luck.
+    """
+    start = text.find(opener)
+    while start != -1:
+        try:
+            value, _ = _JSON_DECODER.raw_decode(text, start)
+            return value
+        except ValueError:
+            start = text.find(opener, start + 1)
+    return None
+
+def _json_default(obj):
+    """Serialize in-memory set-backed dedup collections as sorted lists"""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if isinstance(obj, dict):  # Counter and other dict subclasses
+        return dict(obj)
+    return list(obj)
+
+try:
+    import orjson
+
+    def _loads(data: bytes) -> Dict:
+        if not isinstance(data, (str, bytes, bytearray, memoryview)):
+            data = memoryview(data)  # zero-copy view over mmap buffers
+        return orjson.loads(data)
+
+    def _dumps(obj: Dict) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=_json_default)
+
+    def _dumps_line(obj: Dict) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _loads(data: bytes) -> Dict:
+        if not isinstance(data, (str, bytes, bytearray)):
+            data = bytes(data)  # json.loads rejects mmap buffers
+        return json.loads(data)
+
+    def _dumps(obj: Dict) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False,
+                          default=_json_default).encode('utf-8')
+
+    def _dumps_line(obj: Dict) -> bytes:
+        return json.dumps(obj, ensure_ascii=False,
+                          default=_json_default).encode('utf-8')
+
+# Append-only learning history goes to a JSON Lines side file so each
+# evaluation or feedback event writes only its own bytes; the main JSON
+# file keeps the in-place-mutated fields (patterns, success_metrics)
+_EVENT_FIELDS = ('evaluations', 'improvements', 'user_feedback')
+
+# Soft cap on distinct SQL patterns remembered per phrase
+_MAX_SQL_PATTERNS = 32
+
+# Prune common_issues counters past this many distinct issues, keeping the
+# most frequent ones
+_MAX_DISTINCT_ISSUES = 50
+_KEEP_ISSUES_ON_PRUNE = 30
+
+# Common words to drop when extracting key phrases
+_STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at',
+                         'to', 'for', 'of', 'with', 'by'})
+
+# Strips punctuation in one C-level pass, so "ledgers?" and "ledgers"
+# land on the same pattern key
+_PUNCT_TBL = str.maketrans('', '', string.punctuation)
+
+@functools.lru_cache(maxsize=4096)
+def _extract_key_phrases_cached(query: str) -> tuple:
+    """Extract significant words and bigrams, memoized on the raw string.
+
+    _store_evaluation and get_improvement_suggestions re-extract the same
+    query within one judge cycle, so the split/filter/bigram work is cached.
+    """
+    words = [w for w in query.lower().translate(_PUNCT_TBL).split()
+             if w not in _STOP_WORDS]
+    if not words:
+        return ()
+    return tuple(words) + tuple(a + ' ' + b for a, b in zip(words, words[1:]))
+
+# Static prompt text lives in one module-level template; per-judgment
+# calls only substitute the four dynamic fields instead of rebuilding
+# the whole block through f-string interpolation
+_PROMPT_TEMPLATE = """
+You are an expert SQL judge evaluating the quality of automatically generated SQL queries for a Tally ERP system.
+
+TASK: Evaluate how well the generated SQL query matches the natural language request.
+
+NATURAL LANGUAGE QUERY:
+{nl}
+
+GENERATED SQL QUERY:
+{sql}
+
+AVAILABLE SCHEMA SUMMARY:
+{schema}
+{exec_info}
+
+EVALUATION CRITERIA:
+1. Correctness: Does the SQL correctly interpret the natural language intent?
+2. Completeness: Does it include all necessary conditions and filters?
+3. Security: Are there proper parameter bindings and user/company filters?
+4. Efficiency: Is the query structure optimal?
+5. Tally ERP Compliance: Does it follow Tally ERP conventions?
+
+REQUIRED RESPONSE FORMAT (JSON):
+{{
+    "score": <float between 0.0 and 1.0>,
+    "correctness": <float between 0.0 and 1.0>,
+    "completeness": <float between 0.0 and 1.0>,
+    "security": <float between 0.0 and 1.0>,
+    "efficiency": <float between 0.0 and 1.0>,
+    "tally_compliance": <float between 0.0 and 1.0>,
+    "feedback": "<detailed explanation of strengths and weaknesses>",
+    "suggestions": ["<list of specific improvement suggestions>"],
+    "missing_elements": ["<list of missing query elements>"],
+    "security_issues": ["<list of security concerns if any>"],
+    "alternative_approach": "<suggest better SQL if current is poor>"
+}}
+
+Provide your evaluation:
+"""
+
 class GroqLLMJudge:
-    def __init__(self, api_key: Optional[str] = "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"):
+    def __init__(self, api_key: Optional[str] = None):
         """
         Initialize Groq LLM Judge
-        
+
         Args:
             api_key: Groq API key. If None, will look for GROQ_API_KEY environment variable
         """
-        self.api_key = "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" or os.getenv('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')
+        # Read at construction time so a load_dotenv() that runs after
+        # this module is imported is still honored
+        self.api_key = api_key or os.environ.get('GROQ_API_KEY')
         if not self.api_key:
             raise ValueError("Groq API key must be provided either as parameter or GROQ_API_KEY environment variable")
         
@@ -21,20 +174,82 @@ class GroqLLMJudge:
         self.model = "mixtral-8x7b-32768"  # Groq's Mixtral model
         self.max_tokens = 2048
         self.temperature = 0.1  # Low temperature for consistent judgment
-        
+
+        # One pooled session for all API calls - keepalive and TLS session
+        # reuse skip the per-request handshake, and transient 5xx/429
+        # responses retry with backoff instead of surfacing immediately
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            # allowed_methods must name POST explicitly - urllib3's default
+            # excludes it, which would make the status retries a no-op for
+            # these calls. Judgments are idempotent enough to re-send.
+            max_retries=Retry(total=3, backoff_factor=0.2,
+                              status_forcelist=[429, 500, 502, 503, 504],
+                              allowed_methods=frozenset({'POST'}))
+        )
+        self._session.mount('https://', adapter)
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self._schema_cache = {}
+
         # Learning data storage
         self.learning_data_file = "llm_learning_data.json"
+        self.events_file = "llm_learning_events.jsonl"
+        self._events_fh = None
+        self._start_saver()
         self.load_learning_data()
+
+    def _start_saver(self):
+        """Start the background snapshot writer
+
+        Serializing and fsyncing the whole learning dict on every
+        evaluation blocks the request path for longer as the file grows.
+        save_learning_data now just drops a token on a one-slot queue and
+        returns; this daemon thread drains it and does the disk work, so
+        bursts of saves coalesce into a single write.
+        """
+        self._save_lock = threading.Lock()
+        self._save_queue = queue.Queue(maxsize=1)
+        threading.Thread(target=self._save_loop, daemon=True).start()
+        # The writer thread dies with the process; make sure the last
+        # snapshot actually reaches disk
+        atexit.register(self._write_learning_data)
+
+    def _save_loop(self):
+        while True:
+            self._save_queue.get()
+            self._write_learning_data()
     
     def load_learning_data(self):
         """Load existing learning data"""
         try:
-            with open(self.learning_data_file, 'r') as f:
-                self.learning_data = json.load(f)
+            # Map the snapshot instead of reading it through the IO buffer;
+            # the parser consumes the pages directly (orjson - the stdlib
+            # fallback still takes a bytes copy)
+            with open(self.learning_data_file, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    self.learning_data = _loads(mm)
+                finally:
+                    mm.close()
+            for field in _EVENT_FIELDS:
+                self.learning_data.setdefault(field, [])
+            # Dedup collections live as sets in memory, lists on disk;
+            # common_issues is a Counter (older files stored a flat list)
+            for pattern_data in self.learning_data.get('patterns', {}).values():
+                if 'successful_sql_patterns' in pattern_data:
+                    pattern_data['successful_sql_patterns'] = set(pattern_data['successful_sql_patterns'])
+                if 'common_issues' in pattern_data:
+                    pattern_data['common_issues'] = Counter(pattern_data['common_issues'])
         except FileNotFoundError:
             self.learning_data = {
                 'evaluations': [],
                 'improvements': [],
+                'user_feedback': [],
                 'patterns': {},
                 'success_metrics': {
                     'total_queries': 0,
@@ -43,12 +258,130 @@ class GroqLLMJudge:
                     'user_positive_feedback': 0
                 }
             }
+        self._init_score_counters()
+        self._load_events()
+
+    def _init_score_counters(self):
+        """Zero the running score aggregates
+
+        generate_learning_report and _calculate_improvement_trends used to
+        re-scan the full evaluation history; _fold_score updates these as
+        evaluations stream in, making both O(1).
+        """
+        self._score_sum = 0.0
+        self._score_count = 0
+        self._success_count = 0
+        self._score_window = deque(maxlen=20)
+
+    def _fold_score(self, judgment: Dict):
+        """Fold one evaluation's score into the running aggregates"""
+        score = judgment.get('score', 0)
+        self._score_sum += score
+        self._score_count += 1
+        if score > 0.7:
+            self._success_count += 1
+        self._score_window.append(score)
+
+    def _load_events(self):
+        """Stream the append-only event log into the in-memory state
+
+        Evaluation records are folded into the score aggregates and then
+        dropped - nothing reads the bodies at runtime, so keeping tens of
+        thousands of them in memory only inflates the heap and startup
+        time. iter_evaluations streams them from the log when the full
+        history is actually wanted.
+        """
+        if os.path.exists(self.events_file):
+            # The event log is authoritative; a file written by an older
+            # version may still carry stale inline copies of these lists
+            for field in _EVENT_FIELDS:
+                self.learning_data[field] = []
+            with open(self.events_file, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        event = _loads(line)
+                        if event['kind'] == 'evaluations':
+                            self._fold_score(event['entry'].get('judgment', {}))
+                        else:
+                            self.learning_data[event['kind']].append(event['entry'])
+                    except Exception:
+                        # torn tail line from a crash mid-append, or an
+                        # unrecognized kind - skip rather than abort the load
+                        continue
+        else:
+            if any(self.learning_data[field] for field in _EVENT_FIELDS):
+                # Migrate lists stored inline by older versions into the log
+                with open(self.events_file, 'ab') as f:
+                    for field in _EVENT_FIELDS:
+                        for entry in self.learning_data[field]:
+                            f.write(_dumps_line({'kind': field, 'entry': entry}) + b'\n')
+            for entry in self.learning_data['evaluations']:
+                self._fold_score(entry.get('judgment', {}))
+            self.learning_data['evaluations'] = []
+
+    def iter_evaluations(self):
+        """Yield evaluation records from the log one at a time"""
+        if not os.path.exists(self.events_file):
+            return
+        with open(self.events_file, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = _loads(line)
+                    if event.get('kind') != 'evaluations':
+                        continue
+                    entry = event['entry']
+                except Exception:
+                    continue
+                yield entry
+
+    def _append_event(self, kind: str, entry: Dict):
+        """Append one event record to the JSONL log - O(entry) bytes"""
+        if self._events_fh is None:
+            self._events_fh = open(self.events_file, 'ab')
+        self._events_fh.write(_dumps_line({'kind': kind, 'entry': entry}) + b'\n')
+        self._events_fh.flush()
     
     def save_learning_data(self):
-        """Save learning data to file"""
+        """Request a snapshot write without blocking the caller"""
         try:
-            with open(self.learning_data_file, 'w') as f:
-                json.dump(self.learning_data, f, indent=2)
+            self._save_queue.put_nowait(True)
+        except queue.Full:
+            pass  # a write is already pending; it will see this change too
+
+    def _write_learning_data(self):
+        """Save learning data to file atomically"""
+        try:
+            # Serialize once under the lock - mutators take the same lock, so
+            # the snapshot never sees a dict or set resizing mid-iteration -
+            # and write to a temp file, then os.replace so a crash mid-write
+            # never leaves a truncated file.
+            # Append-only histories live in the JSONL log; rewrite only the
+            # fields that mutate in place
+            with self._save_lock:
+                payload = _dumps({k: v for k, v in self.learning_data.items()
+                                  if k not in _EVENT_FIELDS})
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.learning_data_file) or '.',
+                suffix='.tmp'
+            )
+            try:
+                with os.fdopen(fd, 'wb', buffering=1 << 20) as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.learning_data_file)
+            except Exception:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
         except Exception as e:
             print(f"Error saving learning data: {e}")
     
@@ -85,35 +418,73 @@ class GroqLLMJudge:
                 'suggestions': []
             }
     
-    def _prepare_judgment_context(self, natural_query: str, generated_sql: str, 
-                                 schema_info: Dict, execution_result: Dict = None) -> str:
-        """Prepare context prompt for LLM judgment"""
-        
-        # Get relevant schema information
+    def judge_query_quality_stream(self, natural_query: str, generated_sql: str,
+                                   schema_info: Dict, execution_result: Dict = None):
+        """
+        Yield judgment tokens as they arrive from Groq instead of blocking
+        until the full response; pass the accumulated text to
+        parse_streamed_judgment afterwards.
+        """
+        context = self._prepare_judgment_context(natural_query, generated_sql, schema_info, execution_result)
+        yield from self._call_groq_api_stream(context)
+
+    def parse_streamed_judgment(self, natural_query: str, generated_sql: str,
+                                response_text: str) -> Dict:
+        """Parse accumulated streamed output and record it for learning"""
+        judgment = self._parse_judgment_response(response_text)
+        if judgment.get('success'):
+            self._store_evaluation(natural_query, generated_sql, judgment)
+        return judgment
+
+    def judge_query_quality_batch(self, query_sql_pairs: List[Tuple[str, str]],
+                                  schema_info: Dict) -> List[Dict]:
+        """
+        Judge several (natural_query, generated_sql) pairs in one API call
+
+        Returns one judgment dict per input pair, in order.
+        """
+        context = self._prepare_batch_context(query_sql_pairs, schema_info)
+
+        try:
+            response = self._call_groq_api(context)
+            judgments = self._parse_batch_response(response, len(query_sql_pairs))
+        except Exception as e:
+            judgments = [{
+                'success': False,
+                'error': f"LLM judgment failed: {str(e)}",
+                'score': 0.5,
+                'feedback': "Unable to get LLM judgment",
+                'suggestions': []
+            } for _ in query_sql_pairs]
+
+        # Store evaluations for learning, same as the single-query path
+        for (natural_query, generated_sql), judgment in zip(query_sql_pairs, judgments):
+            if judgment.get('success'):
+                self._store_evaluation(natural_query, generated_sql, judgment)
+
+        return judgments
+
+    def _prepare_batch_context(self, query_sql_pairs: List[Tuple[str, str]],
+                               schema_info: Dict) -> str:
+        """Prepare a single prompt covering multiple (query, sql) pairs"""
         schema_summary = self._summarize_schema(schema_info)
-        
-        # Include execution results if available
-        execution_info = ""
-        if execution_result:
-            if execution_result.get('success'):
-                execution_info = f"\n\nExecution Result: SUCCESS - Returned {len(execution_result.get('data', []))} records"
-            else:
-                execution_info = f"\n\nExecution Result: FAILED - Error: {execution_result.get('error', 'Unknown error')}"
-        
+
+        pair_sections = []
+        for i, (natural_query, generated_sql) in enumerate(query_sql_pairs, 1):
+            pair_sections.append(
+                f"PAIR {i}:\nNATURAL LANGUAGE QUERY:\n{natural_query}\n"
+                f"GENERATED SQL QUERY:\n{generated_sql}"
+            )
+
         context = f"""
 You are an expert SQL judge evaluating the quality of automatically generated SQL queries for a Tally ERP system.
 
-TASK: Evaluate how well the generated SQL query matches the natural language request.
-
-NATURAL LANGUAGE QUERY:
-{natural_query}
+TASK: Evaluate how well each generated SQL query matches its natural language request.
 
-GENERATED SQL QUERY:
-{generated_sql}
+{chr(10).join(pair_sections)}
 
 AVAILABLE SCHEMA SUMMARY:
 {schema_summary}
-{execution_info}
 
 EVALUATION CRITERIA:
 1. Correctness: Does the SQL correctly interpret the natural language intent?
@@ -122,8 +493,8 @@ EVALUATION CRITERIA:
 4. Efficiency: Is the query structure optimal?
 5. Tally ERP Compliance: Does it follow Tally ERP conventions?
 
-REQUIRED RESPONSE FORMAT (JSON):
-{{
+REQUIRED RESPONSE FORMAT: a JSON array with one object per pair, in order:
+[{{
     "score": <float between 0.0 and 1.0>,
     "correctness": <float between 0.0 and 1.0>,
     "completeness": <float between 0.0 and 1.0>,
@@ -135,16 +506,76 @@ REQUIRED RESPONSE FORMAT (JSON):
     "missing_elements": ["<list of missing query elements>"],
     "security_issues": ["<list of security concerns if any>"],
     "alternative_approach": "<suggest better SQL if current is poor>"
-}}
+}}, ...]
 
 Provide your evaluation:
 """
         return context
+
+    def _parse_batch_response(self, response: str, expected_count: int) -> List[Dict]:
+        """Parse a batched LLM response into one judgment per pair"""
+        judgments = []
+        items = _extract_json_value(response, '[')
+        if not isinstance(items, list):
+            items = []
+
+        for item in items[:expected_count]:
+            # Reuse the single-response normalization/validation
+            judgments.append(self._parse_judgment_response(json.dumps(item)))
+
+        # Pad with neutral fallbacks if the model returned too few items
+        while len(judgments) < expected_count:
+            judgments.append({
+                'success': False,
+                'error': 'Batched response missing this pair',
+                'score': 0.5,
+                'feedback': "Unable to get LLM judgment",
+                'suggestions': []
+            })
+
+        return judgments
+
+    def _prepare_judgment_context(self, natural_query: str, generated_sql: str,
+                                 schema_info: Dict, execution_result: Dict = None) -> str:
+        """Prepare context prompt for LLM judgment"""
+        
+        # Get relevant schema information
+        schema_summary = self._summarize_schema(schema_info)
+        
+        # Include execution results if available
+        execution_info = ""
+        if execution_result:
+            if execution_result.get('success'):
+                execution_info = f"\n\nExecution Result: SUCCESS - Returned {len(execution_result.get('data', []))} records"
+            else:
+                execution_info = f"\n\nExecution Result: FAILED - Error: {execution_result.get('error', 'Unknown error')}"
+
+        return _PROMPT_TEMPLATE.format(nl=natural_query, sql=generated_sql,
+                                       schema=schema_summary,
+                                       exec_info=execution_info)
     
     def _summarize_schema(self, schema_info: Dict) -> str:
-        """Create a concise schema summary for the LLM"""
+        """Create a concise schema summary for the LLM, cached per schema
+
+        Callers hand in fresh dict copies (st.cache_data unpickles a new
+        one per call), so identity is no key - a freed dict's address can
+        be reused by a different schema. The table-name tuple is a cheap
+        stable key, and the cache is cleared once it collects more
+        distinct schemas than a session realistically sees.
+        """
+        key = (len(schema_info), tuple(schema_info))
+        cached = self._schema_cache.get(key)
+        if cached is not None:
+            return cached
+        summary = self._summarize_schema_uncached(schema_info)
+        if len(self._schema_cache) >= 8:
+            self._schema_cache.clear()
+        self._schema_cache[key] = summary
+        return summary
+
+    def _summarize_schema_uncached(self, schema_info: Dict) -> str:
         summary_parts = []
-        
+
         for table_name, table_info in schema_info.items():
             if isinstance(table_info, dict) and 'columns' in table_info:
                 key_columns = []
@@ -162,11 +593,6 @@ Provide your evaluation:
     
     def _call_groq_api(self, context: str) -> str:
         """Make API call to Groq"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": [
@@ -183,20 +609,57 @@ Provide your evaluation:
             "temperature": self.temperature
         }
         
-        response = requests.post(self.base_url, headers=headers, json=payload, timeout=30)
+        response = self._session.post(self.base_url, headers=self._headers,
+                                      json=payload, timeout=30)
         response.raise_for_status()
         
         response_data = response.json()
         return response_data['choices'][0]['message']['content']
     
+    def _call_groq_api_stream(self, context: str):
+        """Make a streaming API call to Groq, yielding content chunks"""
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert SQL query evaluator for Tally ERP systems. Always respond with valid JSON format."
+                },
+                {
+                    "role": "user",
+                    "content": context
+                }
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "stream": True
+        }
+
+        with self._session.post(self.base_url, headers=self._headers,
+                                json=payload, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                line = line.decode('utf-8')
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)['choices'][0]['delta'].get('content')
+                except (KeyError, IndexError, json.JSONDecodeError):
+                    continue
+                if chunk:
+                    yield chunk
+
     def _parse_judgment_response(self, response: str) -> Dict:
         """Parse LLM response into structured judgment"""
         try:
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                judgment_data = json.loads(json_match.group())
-            else:
+            # Extract the first JSON object from the response
+            judgment_data = _extract_json_value(response)
+            if judgment_data is None:
                 # Fallback parsing if no JSON found
                 judgment_data = self._fallback_parse_response(response)
             
@@ -252,15 +715,19 @@ Provide your evaluation:
             'llm_model': self.model
         }
         
-        self.learning_data['evaluations'].append(evaluation_entry)
-        
-        # Update metrics
-        self.learning_data['success_metrics']['total_queries'] += 1
-        if judgment.get('score', 0) > 0.7:
-            self.learning_data['success_metrics']['llm_approved_queries'] += 1
-        
-        # Extract patterns for future improvement
-        self._extract_patterns(natural_query, sql_query, judgment)
+        # The log is the history; only the aggregates stay in memory
+        self._append_event('evaluations', evaluation_entry)
+        self._fold_score(judgment)
+
+        # Mutate under the save lock so the writer thread never serializes
+        # learning_data while it is changing size
+        with self._save_lock:
+            self.learning_data['success_metrics']['total_queries'] += 1
+            if judgment.get('score', 0) > 0.7:
+                self.learning_data['success_metrics']['llm_approved_queries'] += 1
+
+            # Extract patterns for future improvement
+            self._extract_patterns(natural_query, sql_query, judgment)
         
         # Save data
         self.save_learning_data()
@@ -275,8 +742,8 @@ Provide your evaluation:
                 self.learning_data['patterns'][phrase] = {
                     'count': 0,
                     'avg_score': 0,
-                    'common_issues': [],
-                    'successful_sql_patterns': []
+                    'common_issues': Counter(),
+                    'successful_sql_patterns': set()
                 }
             
             pattern_data = self.learning_data['patterns'][phrase]
@@ -287,40 +754,29 @@ Provide your evaluation:
             new_score = judgment.get('score', 0.5)
             pattern_data['avg_score'] = (current_avg * (pattern_data['count'] - 1) + new_score) / pattern_data['count']
             
-            # Store common issues
+            # Store common issues as frequency counts rather than an
+            # unbounded list that grows per evaluation
             if judgment.get('missing_elements'):
-                pattern_data['common_issues'].extend(judgment['missing_elements'])
+                issues = pattern_data['common_issues']
+                issues.update(judgment['missing_elements'])
+                if len(issues) > _MAX_DISTINCT_ISSUES:
+                    pattern_data['common_issues'] = Counter(
+                        dict(issues.most_common(_KEEP_ISSUES_ON_PRUNE)))
             
-            # Store successful patterns
+            # Store successful patterns - O(1) set insert with a soft cap
             if new_score > 0.8:
-                sql_pattern = self._generalize_sql_pattern(sql_query)
-                if sql_pattern not in pattern_data['successful_sql_patterns']:
-                    pattern_data['successful_sql_patterns'].append(sql_pattern)
+                successful = pattern_data['successful_sql_patterns']
+                if len(successful) < _MAX_SQL_PATTERNS:
+                    successful.add(self._generalize_sql_pattern(sql_query))
     
     def _extract_key_phrases(self, query: str) -> List[str]:
         """Extract key phrases from natural language query"""
-        # Simple implementation - can be enhanced
-        words = query.lower().split()
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        words = [w for w in words if w not in stop_words]
-        
-        phrases = words.copy()
-        
-        # Add bigrams
-        for i in range(len(words) - 1):
-            phrases.append(f"{words[i]} {words[i+1]}")
-        
-        return phrases
+        return list(_extract_key_phrases_cached(query))
     
     def _generalize_sql_pattern(self, sql_query: str) -> str:
         """Generalize SQL query to extract reusable pattern"""
-        pattern = sql_query.lower()
-        
-        # Replace specific values with placeholders
-        pattern = re.sub(r"'[^']*'", "'<STRING>'", pattern)
-        pattern = re.sub(r'\b\d+\b', '<NUMBER>', pattern)
-        
-        return pattern
+        # Replace specific values with placeholders in one pass
+        return _RE_GEN.sub(_gen_repl, sql_query.lower())
     
     def get_improvement_suggestions(self, natural_query: str) -> Dict:
         """Get improvement suggestions based on learning data"""
@@ -339,10 +795,11 @@ Provide your evaluation:
                 # Adjust confidence based on historical performance
                 if pattern_data['avg_score'] < 0.5:
                     suggestions['confidence_adjustments'] *= 0.8
-                    suggestions['potential_issues'].extend(pattern_data['common_issues'][:3])
+                    suggestions['potential_issues'].extend(
+                        issue for issue, _ in pattern_data['common_issues'].most_common(3))
                 elif pattern_data['avg_score'] > 0.8:
                     suggestions['confidence_adjustments'] *= 1.1
-                    suggestions['common_patterns'].extend(pattern_data['successful_sql_patterns'][:2])
+                    suggestions['common_patterns'].extend(list(pattern_data['successful_sql_patterns'])[:2])
         
         return suggestions
     
@@ -357,28 +814,51 @@ Provide your evaluation:
             'user_comments': user_comments
         }
         
-        if 'user_feedback' not in self.learning_data:
-            self.learning_data['user_feedback'] = []
-        
-        self.learning_data['user_feedback'].append(feedback_entry)
-        
-        # Update metrics
+        self.learning_data.setdefault('user_feedback', []).append(feedback_entry)
+        self._append_event('user_feedback', feedback_entry)
+
+        # Update metrics under the save lock (see _write_learning_data)
         if user_rating == 'positive':
-            self.learning_data['success_metrics']['user_positive_feedback'] += 1
+            with self._save_lock:
+                self.learning_data['success_metrics']['user_positive_feedback'] += 1
         
         # Store for future training
         self.save_learning_data()
     
+    def provide_user_feedback_batch(self, feedback_entries: List[Tuple[str, str, str, str]]):
+        """Record several (query, sql, rating, comments) entries with one save
+
+        Batched counterpart of provide_user_feedback - N buffered ratings
+        cost a single file write instead of one per click.
+        """
+        user_feedback = self.learning_data.setdefault('user_feedback', [])
+
+        timestamp = datetime.now().isoformat()
+        for natural_query, sql_query, user_rating, user_comments in feedback_entries:
+            entry = {
+                'timestamp': timestamp,
+                'natural_query': natural_query,
+                'sql_query': sql_query,
+                'user_rating': user_rating,
+                'user_comments': user_comments
+            }
+            user_feedback.append(entry)
+            self._append_event('user_feedback', entry)
+            if user_rating == 'positive':
+                with self._save_lock:
+                    self.learning_data['success_metrics']['user_positive_feedback'] += 1
+
+        self.save_learning_data()
+
     def generate_learning_report(self) -> Dict:
         """Generate comprehensive learning report"""
-        total_evals = len(self.learning_data['evaluations'])
-        
+        total_evals = self._score_count
+
         if total_evals == 0:
             return {'message': 'No evaluations available yet'}
-        
-        # Calculate average scores
-        scores = [eval_data['judgment'].get('score', 0) for eval_data in self.learning_data['evaluations']]
-        avg_score = sum(scores) / len(scores) if scores else 0
+
+        # Averages come from running totals - no history scan
+        avg_score = self._score_sum / total_evals
         
         # Find most problematic patterns
         problematic_patterns = []
@@ -388,7 +868,7 @@ Provide your evaluation:
                     'phrase': phrase,
                     'avg_score': data['avg_score'],
                     'count': data['count'],
-                    'issues': data['common_issues'][:3]
+                    'issues': [issue for issue, _ in data['common_issues'].most_common(3)]
                 })
         
         problematic_patterns.sort(key=lambda x: x['avg_score'])
@@ -396,7 +876,7 @@ Provide your evaluation:
         return {
             'total_evaluations': total_evals,
             'average_llm_score': avg_score,
-            'success_rate': len([s for s in scores if s > 0.7]) / len(scores) if scores else 0,
+            'success_rate': self._success_count / total_evals,
             'top_problematic_patterns': problematic_patterns[:5],
             'metrics': self.learning_data['success_metrics'],
             'improvement_trends': self._calculate_improvement_trends()
@@ -404,14 +884,16 @@ Provide your evaluation:
     
     def _calculate_improvement_trends(self) -> Dict:
         """Calculate improvement trends over time"""
-        if len(self.learning_data['evaluations']) < 10:
+        if self._score_count < 10:
             return {'message': 'Insufficient data for trend analysis'}
-        
-        recent_evals = self.learning_data['evaluations'][-10:]
-        older_evals = self.learning_data['evaluations'][-20:-10] if len(self.learning_data['evaluations']) >= 20 else []
-        
-        recent_avg = sum(eval_data['judgment'].get('score', 0) for eval_data in recent_evals) / len(recent_evals)
-        older_avg = sum(eval_data['judgment'].get('score', 0) for eval_data in older_evals) / len(older_evals) if older_evals else recent_avg
+
+        # The bounded window already holds the last 20 scores
+        window = list(self._score_window)
+        recent_scores = window[-10:]
+        older_scores = window[-20:-10] if self._score_count >= 20 else []
+
+        recent_avg = sum(recent_scores) / len(recent_scores)
+        older_avg = sum(older_scores) / len(older_scores) if older_scores else recent_avg
         
         return {
             'recent_average': recent_avg,
@@ -6,9 +6,25 @@ from datetime import datetime
 class QueryExecutor:
     def __init__(self):
         self.dangerous_keywords = [
-            'DROP', 'TRUNCATE', 'EXEC', 'EXECUTE', 
+            'DROP', 'TRUNCATE', 'EXEC', 'EXECUTE',
             'SCRIPT', 'SHUTDOWN', 'GRANT', 'REVOKE'
         ]
+        # One case-insensitive alternation finds the first dangerous
+        # keyword in a single scan, instead of uppercasing the query and
+        # walking it once per keyword
+        self._danger_re = re.compile('|'.join(
+            map(re.escape, self.dangerous_keywords)),
+            re.IGNORECASE)
+        # Injection heuristics fused into one compiled alternation
+        self._suspicious_re = re.compile('|'.join((
+            r'union\s+select',
+            r';\s*drop',
+            r';\s*delete',
+            r';\s*update',
+            r';\s*insert',
+            r'1\s*=\s*1',
+            r'\'.*or.*\'.*=.*\'',
+        )), re.IGNORECASE)
         
     def execute(self, sql_query: str, connection: Optional[sqlite3.Connection], 
                 parameters: Optional[List[Any]] = None) -> Dict[str, Any]:
@@ -55,16 +71,16 @@ class QueryExecutor:
             if sql_query.strip().upper().startswith('SELECT'):
                 columns = [description[0] for description in cursor.description]
                 rows = cursor.fetchall()
-                
-                data = []
-                for row in rows:
-                    data.append(dict(zip(columns, row)))
-                
+
+                # Return rows as tuples plus a columns list instead of one
+                # dict per row - no per-row dict construction, and pandas
+                # can build the frame columnar-style without key scans
                 return {
                     'success': True,
-                    'data': data,
+                    'data': rows,
+                    'columns': columns,
                     'error': None,
-                    'rows_affected': len(data)
+                    'rows_affected': len(rows)
                 }
             
             else:
@@ -111,71 +127,80 @@ class QueryExecutor:
     
     def _validate_query(self, sql_query: str) -> Dict[str, Any]:
         """Enhanced query validation"""
-        query_upper = sql_query.upper()
-        
-        # Check for dangerous keywords
-        for keyword in self.dangerous_keywords:
-            if keyword in query_upper:
-                return {
-                    'safe': False,
-                    'reason': f"Query contains potentially dangerous keyword: {keyword}"
-                }
-        
-        # Check for multiple statements
-        if self._has_multiple_statements(sql_query):
+        # Check for dangerous keywords in one pass
+        danger_match = self._danger_re.search(sql_query)
+        if danger_match:
             return {
                 'safe': False,
-                'reason': "Multiple SQL statements detected. Only single statements are allowed."
+                'reason': f"Query contains potentially dangerous keyword: {danger_match.group().upper()}"
             }
-        
+
+        scan = self._scan_query(sql_query)
+
         # Check for comments
-        if '--' in sql_query or '/*' in sql_query:
+        if scan['comment']:
             return {
                 'safe': False,
                 'reason': "SQL comments detected. Comments are not allowed for security."
             }
-        
+
+        # Check for multiple statements
+        if scan['multiple']:
+            return {
+                'safe': False,
+                'reason': "Multiple SQL statements detected. Only single statements are allowed."
+            }
+
         # Validate balanced quotes
-        if not self._balanced_quotes(sql_query):
+        if not scan['balanced']:
             return {
                 'safe': False,
                 'reason': "Unbalanced quotes detected. Possible SQL injection attempt."
             }
-        
+
         # Check for suspicious patterns
-        suspicious_patterns = [
-            r'union\s+select',
-            r';\s*drop',
-            r';\s*delete',
-            r';\s*update',
-            r';\s*insert',
-            r'1\s*=\s*1',
-            r'\'.*or.*\'.*=.*\'',
-        ]
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, sql_query, re.IGNORECASE):
-                return {
-                    'safe': False,
-                    'reason': f"Suspicious pattern detected: possible SQL injection attempt"
-                }
-        
+        if self._suspicious_re.search(sql_query):
+            return {
+                'safe': False,
+                'reason': "Suspicious pattern detected: possible SQL injection attempt"
+            }
+
         return {'safe': True, 'reason': None}
-    
-    def _has_multiple_statements(self, sql_query: str) -> bool:
-        """Check if query contains multiple statements"""
-        cleaned = self._remove_string_literals(sql_query)
-        return ';' in cleaned and not cleaned.strip().endswith(';')
-    
-    def _balanced_quotes(self, sql_query: str) -> bool:
-        """Check if quotes are balanced"""
-        single_quotes = sql_query.count("'") - sql_query.count("\\'")
-        double_quotes = sql_query.count('"') - sql_query.count('\\"')
-        
-        return single_quotes % 2 == 0 and double_quotes % 2 == 0
-    
-    def _remove_string_literals(self, sql_query: str) -> str:
-        """Remove string literals for analysis"""
-        result = re.sub(r"'[^']*'", "''", sql_query)
-        result = re.sub(r'"[^"]*"', '""', result)
-        return result
+
+    def _scan_query(self, sql_query: str) -> Dict[str, bool]:
+        """Gather quote, statement and comment state in one traversal
+
+        A small character FSM replaces the separate regex substitutions,
+        substring searches and quote counts that each walked the query
+        again: it tracks whether we are inside a string literal and
+        accumulates quote balance, semicolons outside literals and
+        comment markers outside literals in a single pass.
+        """
+        in_single = in_double = False
+        semi = comment = False
+        prev = ''
+        last_nonspace = ''
+        for ch in sql_query:
+            if in_single:
+                if ch == "'" and prev != '\\':
+                    in_single = False
+            elif in_double:
+                if ch == '"' and prev != '\\':
+                    in_double = False
+            elif ch == "'":
+                in_single = True
+            elif ch == '"':
+                in_double = True
+            elif ch == ';':
+                semi = True
+            elif (ch == '-' and prev == '-') or (ch == '*' and prev == '/'):
+                comment = True
+            if not ch.isspace():
+                last_nonspace = ch
+            prev = ch
+        return {
+            'balanced': not in_single and not in_double,
+            # A trailing semicolon alone does not make a second statement
+            'multiple': semi and last_nonspace != ';',
+            'comment': comment,
+        }
@@ -2,6 +2,16 @@ import re
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass
 
+def _compile_alias_re(aliases) -> re.Pattern:
+    """Build one alternation matching any alias in a single scan.
+
+    Longest aliases first so 'vouchers' wins over 'voucher' at the same
+    position; only a leading word boundary, so 'account' still matches
+    inside 'accounting' the way the old substring checks did.
+    """
+    return re.compile(r'\b(' + '|'.join(
+        sorted(map(re.escape, aliases), key=len, reverse=True)) + r')')
+
 @dataclass
 class ParsedQuery:
     """Structured representation of a parsed natural language query"""
@@ -28,7 +38,18 @@ class NaturalLanguageParser:
             'UPDATE': ['update', 'modify', 'change', 'set', 'edit'],
             'DELETE': ['delete', 'remove', 'drop']
         }
-        
+
+        # One alternation over all action keywords - a single scan with
+        # match.lastgroup naming the action replaces up to ~30 substring
+        # searches per query. Word boundaries keep 'drop' from firing
+        # inside 'dropdown' and the like.
+        self._action_re = re.compile('|'.join(
+            '(?P<{}>{})'.format(
+                action,
+                '|'.join(r'\b' + re.escape(keyword) + r'\b' for keyword in keywords))
+            for action, keywords in self.action_patterns.items()
+        ))
+
         # Tally ERP specific table mappings
         self.table_aliases = {
             'employees': 'mst_employee',
@@ -111,7 +132,21 @@ class NaturalLanguageParser:
             'mobile_number': 'mobile',
             'phone_number': 'mobile'
         }
-        
+
+        # One scan per alias table instead of a search per alias (~50 per
+        # query between tables and columns)
+        self._table_alias_re = _compile_alias_re(self.table_aliases)
+        self._column_alias_re = _compile_alias_re(self.column_aliases)
+
+        # Context hints for table inference, grouped by target table;
+        # lastgroup names the hint class in a single pass
+        self._context_hint_re = re.compile(
+            r'\b(?:(?P<employee>salary|payroll|employee|staff)'
+            r'|(?P<voucher>voucher|transaction|sales|purchase)'
+            r'|(?P<ledger>ledger|account|customer|supplier)'
+            r'|(?P<stock>stock|item|inventory|product))'
+        )
+
         # Tally-specific aggregation keywords
         self.aggregation_keywords = {
             'count': ['count', 'how many', 'number of', 'total count'],
@@ -144,17 +179,20 @@ class NaturalLanguageParser:
             'payroll': "voucher_type = 'Payroll'"
         }
         
-        # Date patterns for Tally
+        # Date patterns for Tally, compiled once - these run on every parse
         self.date_patterns = [
-            (r'in (\d{4})', 'year'),
-            (r'in (january|february|march|april|may|june|july|august|september|october|november|december) (\d{4})', 'month_year'),
-            (r'in the last (\d+) (day|month|year)s?', 'relative_date'),
-            (r'since (\d{4}-\d{2}-\d{2})', 'since_date'),
-            (r'before (\d{4}-\d{2}-\d{2})', 'before_date'),
-            (r'on (\d{4}-\d{2}-\d{2})', 'on_date'),
-            (r'today', 'today'),
-            (r'this (month|year)', 'current_period'),
-            (r'last (month|year)', 'last_period')
+            (re.compile(pattern, re.IGNORECASE), date_type)
+            for pattern, date_type in [
+                (r'in (\d{4})', 'year'),
+                (r'in (january|february|march|april|may|june|july|august|september|october|november|december) (\d{4})', 'month_year'),
+                (r'in the last (\d+) (day|month|year)s?', 'relative_date'),
+                (r'since (\d{4}-\d{2}-\d{2})', 'since_date'),
+                (r'before (\d{4}-\d{2}-\d{2})', 'before_date'),
+                (r'on (\d{4}-\d{2}-\d{2})', 'on_date'),
+                (r'today', 'today'),
+                (r'this (month|year)', 'current_period'),
+                (r'last (month|year)', 'last_period')
+            ]
         ]
         
         # GST-specific patterns
@@ -164,7 +202,33 @@ class NaturalLanguageParser:
             'gst registered': 'gstn IS NOT NULL',
             'non gst': 'gstn IS NULL'
         }
-        
+
+        # Precompile the per-keyword patterns the extractors run on every
+        # query - building the pattern string per call paid a regex-cache
+        # lookup and flag fusion for each of ~50 keywords per parse
+        self._condition_patterns = [
+            (operator,
+             re.compile(rf"(\b\w+\b)\s+{re.escape(keyword)}\s+(['\"]?)([^'\"]+?)\2(?:\s|$|,)",
+                        re.IGNORECASE))
+            for operator, keywords in self.condition_keywords.items()
+            for keyword in keywords
+        ]
+        self._group_patterns = [
+            re.compile(rf"{keyword}\s+(\w+)", re.IGNORECASE)
+            for keyword in ['by', 'per', 'for each', 'group by']
+        ]
+        self._limit_patterns = [
+            re.compile(pattern, re.IGNORECASE)
+            for pattern in [
+                r'top (\d+)',
+                r'first (\d+)',
+                r'limit (\d+)',
+                r'up to (\d+)',
+                r'maximum (\d+)',
+                r'(\d+) records?'
+            ]
+        ]
+
     def parse(self, query: str, schema: Dict, user_id: str = "demo_user", company_name: str = "Demo Company Ltd") -> ParsedQuery:
         """Parse natural language query into structured format with Tally context"""
         query_lower = query.lower().strip()
@@ -192,12 +256,9 @@ class NaturalLanguageParser:
     
     def _detect_action(self, query: str) -> str:
         """Detect the SQL action from the query"""
-        for action, keywords in self.action_patterns.items():
-            for keyword in keywords:
-                if keyword in query:
-                    return action
-        return 'SELECT'  # Default
-    
+        match = self._action_re.search(query)
+        return match.lastgroup if match else 'SELECT'
+
     def _parse_select_query(self, query: str, schema: Dict, user_filters: Dict) -> ParsedQuery:
         """Parse a SELECT query with Tally ERP context"""
         tables = self._extract_tables(query, schema)
@@ -228,36 +289,38 @@ class NaturalLanguageParser:
     def _extract_tables(self, query: str, schema: Dict) -> List[str]:
         """Extract table names from query with Tally aliases"""
         tables = []
-        
-        # Check for Tally-specific aliases first
-        for alias, table_name in self.table_aliases.items():
-            if alias in query and table_name in schema:
-                if table_name not in tables:
-                    tables.append(table_name)
-        
+
+        # Check for Tally-specific aliases first - one scan over the query
+        for match in self._table_alias_re.finditer(query):
+            table_name = self.table_aliases[match.group(1)]
+            if table_name in schema and table_name not in tables:
+                tables.append(table_name)
+
         # Check direct table names
         for table_name in schema.keys():
             if table_name.lower() in query:
                 if table_name not in tables:
                     tables.append(table_name)
-        
-        # If no tables found, try to infer from context
+
+        # If no tables found, try to infer from context - collect every
+        # hint class in one pass, then apply the original priority order
         if not tables:
-            if any(word in query for word in ['salary', 'payroll', 'employee', 'staff']):
+            hints = {m.lastgroup for m in self._context_hint_re.finditer(query)}
+            if 'employee' in hints:
                 if 'mst_employee' in schema:
                     tables.append('mst_employee')
                 if 'trn_payhead' in schema:
                     tables.append('trn_payhead')
-            elif any(word in query for word in ['voucher', 'transaction', 'sales', 'purchase']):
+            elif 'voucher' in hints:
                 if 'trn_voucher' in schema:
                     tables.append('trn_voucher')
-            elif any(word in query for word in ['ledger', 'account', 'customer', 'supplier']):
+            elif 'ledger' in hints:
                 if 'mst_ledger' in schema:
                     tables.append('mst_ledger')
-            elif any(word in query for word in ['stock', 'item', 'inventory', 'product']):
+            elif 'stock' in hints:
                 if 'mst_stock_item' in schema:
                     tables.append('mst_stock_item')
-        
+
         return tables
     
     def _extract_columns(self, query: str, schema: Dict, tables: List[str]) -> List[str]:
@@ -268,16 +331,16 @@ class NaturalLanguageParser:
         if any(word in query for word in ['all', 'everything', 'all columns', '*', 'details']):
             return ['*']
         
-        # Check for Tally-specific column aliases
-        for alias, column_name in self.column_aliases.items():
-            if alias in query:
-                # Find which table contains this column
-                for table in tables:
-                    if table in schema:
-                        for col_info in schema[table]['columns']:
-                            if col_info['name'] == column_name:
-                                if column_name not in columns:
-                                    columns.append(column_name)
+        # Check for Tally-specific column aliases - one scan over the query
+        for match in self._column_alias_re.finditer(query):
+            column_name = self.column_aliases[match.group(1)]
+            # Find which table contains this column
+            for table in tables:
+                if table in schema:
+                    for col_info in schema[table]['columns']:
+                        if col_info['name'] == column_name:
+                            if column_name not in columns:
+                                columns.append(column_name)
         
         # Check direct column names from identified tables
         for table in tables:
@@ -312,25 +375,20 @@ class NaturalLanguageParser:
         conditions = []
         
         # Standard condition extraction
-        for operator, keywords in self.condition_keywords.items():
-            for keyword in keywords:
-                # More flexible pattern matching
-                pattern = rf"(\b\w+\b)\s+{re.escape(keyword)}\s+(['\"]?)([^'\"]+?)\2(?:\s|$|,)"
-                matches = re.finditer(pattern, query, re.IGNORECASE)
-                
-                for match in matches:
-                    field = match.group(1)
-                    value = match.group(3).strip()
-                    
-                    # Resolve field aliases
-                    resolved_field = self._resolve_field_alias(field, tables, schema)
-                    if resolved_field:
-                        conditions.append({
-                            'field': resolved_field,
-                            'operator': operator,
-                            'value': value,
-                            'parameterized': True
-                        })
+        for operator, pattern in self._condition_patterns:
+            for match in pattern.finditer(query):
+                field = match.group(1)
+                value = match.group(3).strip()
+
+                # Resolve field aliases
+                resolved_field = self._resolve_field_alias(field, tables, schema)
+                if resolved_field:
+                    conditions.append({
+                        'field': resolved_field,
+                        'operator': operator,
+                        'value': value,
+                        'parameterized': True
+                    })
         
         # Extract GST-specific conditions
         for pattern, condition in self.gst_patterns.items():
@@ -354,8 +412,7 @@ class NaturalLanguageParser:
         
         # Extract date conditions
         for pattern, date_type in self.date_patterns:
-            matches = re.finditer(pattern, query, re.IGNORECASE)
-            for match in matches:
+            for match in pattern.finditer(query):
                 date_columns = self._find_date_columns(tables, schema)
                 if date_columns:
                     conditions.append({
@@ -533,15 +590,12 @@ class NaturalLanguageParser:
             group_by.append("strftime('%Y', date)")
         
         # Standard grouping keywords
-        group_keywords = ['by', 'per', 'for each', 'group by']
-        for keyword in group_keywords:
-            if keyword in query:
-                pattern = rf"{keyword}\s+(\w+)"
-                match = re.search(pattern, query, re.IGNORECASE)
-                if match:
-                    field = match.group(1)
-                    if field in columns or field == '*':
-                        group_by.append(field)
+        for pattern in self._group_patterns:
+            match = pattern.search(query)
+            if match:
+                field = match.group(1)
+                if field in columns or field == '*':
+                    group_by.append(field)
         
         return group_by
     
@@ -565,20 +619,11 @@ class NaturalLanguageParser:
     
     def _extract_limit(self, query: str) -> Optional[int]:
         """Extract LIMIT value from query"""
-        limit_patterns = [
-            r'top (\d+)',
-            r'first (\d+)',
-            r'limit (\d+)',
-            r'up to (\d+)',
-            r'maximum (\d+)',
-            r'(\d+) records?'
-        ]
-        
-        for pattern in limit_patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
+        for pattern in self._limit_patterns:
+            match = pattern.search(query)
             if match:
                 return int(match.group(1))
-        
+
         return None
     
     def _find_date_columns(self, tables: List[str], schema: Dict) -> List[str]:
@@ -10,6 +10,9 @@ class SchemaManager:
         self.db_path = db_path
         self.schema = {}
         self.connection = None
+        self.version = 0  # Bumped on every schema (re)load so caches can key on it
+        self._partitioned = None  # (master, transaction, other) cache, keyed on version
+        self._partitioned_version = -1
         self._ensure_database_exists()
         
     def _ensure_database_exists(self):
@@ -303,6 +306,19 @@ class SchemaManager:
             }
         }
         
+        # Tag each table with its kind once at load time so consumers read a
+        # field instead of re-testing name prefixes on every pass
+        for name, table_info in self.schema.items():
+            if name.startswith('mst_'):
+                table_info['kind'] = 'master'
+            elif name.startswith('trn_'):
+                table_info['kind'] = 'txn'
+            else:
+                table_info['kind'] = 'other'
+
+        # Invalidate any caches keyed on the schema version
+        self.version += 1
+
         # Create actual database with sample data
         try:
             self._create_tally_database()
@@ -822,6 +838,22 @@ class SchemaManager:
     def get_schema(self) -> Dict:
         """Get current schema"""
         return self.schema
+
+    def get_partitioned_schema(self) -> tuple:
+        """Get (master, transaction, other) table partitions, computed once per schema load"""
+        if self._partitioned is None or self._partitioned_version != self.version:
+            master, transaction, other = {}, {}, {}
+            for name, table_info in self.schema.items():
+                kind = table_info.get('kind', 'other')
+                if kind == 'master':
+                    master[name] = table_info
+                elif kind == 'txn':
+                    transaction[name] = table_info
+                else:
+                    other[name] = table_info
+            self._partitioned = (master, transaction, other)
+            self._partitioned_version = self.version
+        return self._partitioned
     
     def get_connection(self) -> Optional[sqlite3.Connection]:
         """Get database connection"""
@@ -848,25 +880,41 @@ class SchemaManager:
         
         try:
             cursor = self.connection.cursor()
-            
-            for table in self.schema.keys():
-                try:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                    row_count = cursor.fetchone()[0]
-                    
-                    stats[table] = {
-                        'row_count': row_count,
-                        'column_count': len(self.schema[table]['columns']),
-                        'relationship_count': len(self.schema[table].get('relationships', []))
-                    }
-                except Exception as e:
-                    stats[table] = {
-                        'row_count': 0,
-                        'column_count': len(self.schema[table]['columns']),
-                        'relationship_count': len(self.schema[table].get('relationships', [])),
-                        'error': str(e)
-                    }
-            
+
+            # Batch all per-table counts into one UNION ALL statement - a
+            # single round-trip instead of one COUNT(*) query per table
+            tables = list(self.schema.keys())
+            count_sql = " UNION ALL ".join(
+                f"SELECT '{table}' AS name, COUNT(*) AS n FROM {table}" for table in tables
+            )
+            try:
+                cursor.execute(count_sql)
+                row_counts = dict(cursor.fetchall())
+            except Exception:
+                # A single missing table fails the whole batch; fall back to
+                # per-table queries so the rest still report correctly
+                row_counts = {}
+                for table in tables:
+                    try:
+                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                        row_counts[table] = cursor.fetchone()[0]
+                    except Exception as e:
+                        stats[table] = {
+                            'row_count': 0,
+                            'column_count': len(self.schema[table]['columns']),
+                            'relationship_count': len(self.schema[table].get('relationships', [])),
+                            'error': str(e)
+                        }
+
+            for table in tables:
+                if table in stats:
+                    continue
+                stats[table] = {
+                    'row_count': row_counts.get(table, 0),
+                    'column_count': len(self.schema[table]['columns']),
+                    'relationship_count': len(self.schema[table].get('relationships', []))
+                }
+
             cursor.close()
             
         except Exception as e: